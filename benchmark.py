@@ -0,0 +1,306 @@
+# benchmark.py
+import os
+import ast
+import json
+import math
+import time
+import tempfile
+from PyQt5.QtWidgets import QInputDialog
+from PyQt5.QtCore import QObject, QProcess, QProcessEnvironment, QTimer, pyqtSignal
+
+INT_PARAMS = {'n', 'size', 'count', 'num', 'number', 'length', 'limit', 'k', 'depth', 'iterations',
+              'steps', 'rounds', 'spins', 'times', 'max_value', 'upper', 'total'}
+LIST_PARAMS = {'data', 'items', 'values', 'nums', 'numbers', 'arr', 'array', 'lst', 'list', 'seq',
+               'sequence', 'xs', 'elements', 'bets', 'records', 'entries'}
+STR_PARAMS = {'text', 's', 'string', 'word', 'sentence', 'message', 'line'}
+ANNOTATION_KINDS = {'int': 'int', 'list': 'list', 'List': 'list', 'Sequence': 'list', 'Iterable': 'list',
+                    'tuple': 'list', 'str': 'str'}
+INPUT_KINDS = ['int', 'list', 'str']
+# The budget is only checked between rounds, so a round that explodes (exponential code
+# jumping from n=8 to n=32) is killed this long after the budget runs out.
+KILL_GRACE_SECONDS = 5.0
+# Calls per input size. Fast sizes get more, slow ones fewer, but never so few that the
+# p95 column is just the slowest call.
+MIN_REPEATS = 20
+MAX_REPEATS = 100
+
+COMPLEXITY_MODELS = [
+    ('O(1)', lambda n: 1.0),
+    ('O(log n)', lambda n: math.log2(n)),
+    ('O(n)', lambda n: float(n)),
+    ('O(n log n)', lambda n: n * math.log2(n)),
+    ('O(n^2)', lambda n: float(n) ** 2),
+    ('O(n^3)', lambda n: float(n) ** 3),
+    ('O(2^n)', lambda n: 2.0 ** min(n, 1000)),
+]
+
+# Runs inside the project's venv: load the module without its __main__ block, then call the
+# entry function at growing input sizes until the time budget runs out. Results are
+# rewritten after every round so a run killed mid-round still reports the finished sizes.
+BENCHMARK_RUNNER = r'''
+import json, random, statistics, string, sys, time
+script, function, param, kind, min_repeats, max_repeats, budget, out_path = sys.argv[1:9]
+min_repeats, max_repeats, budget = int(min_repeats), int(max_repeats), float(budget)
+sys.argv = [script]
+sys.path.insert(0, __import__('os').path.dirname(script))
+namespace = {'__name__': '__benchmark__', '__file__': script}
+try:
+    with open(script) as source:
+        exec(compile(source.read(), script, 'exec'), namespace)
+except BaseException as e:
+    # Top-level code that prompts for input dies on EOF; the functions defined above it remain usable.
+    print(f'Module stopped while loading ({e!r}), benchmarking what was defined before that.')
+func = namespace[function]
+rng = random.Random(0)
+
+def make_input(n):
+    if kind == 'list':
+        return [rng.randint(-n, n) for _ in range(n)]
+    if kind == 'str':
+        return ''.join(rng.choice(string.ascii_lowercase) for _ in range(n))
+    return n
+
+results = []
+size = 8
+repeats = max_repeats
+previous_call = None
+started = time.perf_counter()
+while True:
+    round_started = time.perf_counter()
+    timings = []
+    for _ in range(repeats):
+        arg = make_input(size)
+        t0 = time.perf_counter()
+        func(**{param: arg})
+        timings.append(time.perf_counter() - t0)
+    timings.sort()
+    results.append({'size': size, 'median': statistics.median(timings),
+                    'p95': timings[min(len(timings) - 1, int(round(0.95 * (len(timings) - 1))))],
+                    'runs': len(timings)})
+    with open(out_path, 'w') as file:
+        json.dump(results, file)
+    # Predict the next size's per-call time from the growth measured between the last two
+    # sizes; it is 4x larger, so assume at least 4x as long even when the code looks
+    # sub-linear. Repeats shrink so one round takes at most a quarter of what is left.
+    call_time = (time.perf_counter() - round_started) / repeats
+    growth = max(4.0, call_time / previous_call) if previous_call else 4.0
+    previous_call = call_time
+    next_call = growth * call_time
+    remaining = budget - (time.perf_counter() - started)
+    repeats = max(min_repeats, min(max_repeats, int(remaining / 4 / next_call)))
+    if repeats * next_call > remaining or size >= 1 << 22:
+        break
+    size *= 4
+'''
+
+def _param_kind(arg):
+    if arg.annotation is not None:
+        annotation = arg.annotation
+        if isinstance(annotation, ast.Subscript):
+            annotation = annotation.value
+        name = getattr(annotation, 'id', None) or getattr(annotation, 'attr', None)
+        if name in ANNOTATION_KINDS:
+            return ANNOTATION_KINDS[name]
+    name = arg.arg.lower()
+    if name in INT_PARAMS or name.startswith('num_') or name.endswith('_count') or name.startswith('n_'):
+        return 'int'
+    if name in LIST_PARAMS or name.endswith('s') and len(name) > 3:
+        return 'list'
+    if name in STR_PARAMS:
+        return 'str'
+    return None
+
+def infer_entry(source):
+    # Picks a top-level function that can be called with a single sized argument:
+    # exactly one required parameter whose name or annotation says int, list or str.
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return None
+    candidates = []
+    for node in tree.body:
+        if not isinstance(node, ast.FunctionDef) or node.name.startswith('_') or node.name == 'main':
+            continue
+        args = node.args.posonlyargs + node.args.args
+        required = args[:len(args) - len(node.args.defaults)]
+        required += [a for a, d in zip(node.args.kwonlyargs, node.args.kw_defaults) if d is None]
+        if len(required) != 1 or required[0] in node.args.posonlyargs:
+            continue
+        kind = _param_kind(required[0])
+        if kind:
+            candidates.append((node.name, required[0].arg, kind))
+    return candidates[0] if candidates else None
+
+def function_signatures(source):
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return {}
+    return {node.name: [a.arg for a in node.args.posonlyargs + node.args.args + node.args.kwonlyargs]
+            for node in tree.body if isinstance(node, ast.FunctionDef)}
+
+def estimate_complexity(results):
+    # Least squares in log space against each growth model; the constant factor drops out.
+    points = [(r['size'], r['median']) for r in results if r['median'] > 0]
+    # Tiny inputs mostly measure call overhead, so prefer the sizes that take real time.
+    timed = [(n, t) for n, t in points if t >= 2e-5]
+    if len(timed) >= 3:
+        points = timed
+    if len(points) < 3:
+        return 'unknown'
+    best, best_error = 'unknown', None
+    for name, model in COMPLEXITY_MODELS:
+        logs = [math.log(t) - math.log(model(n)) for n, t in points]
+        mean = sum(logs) / len(logs)
+        error = sum((value - mean) ** 2 for value in logs)
+        if best_error is None or error < best_error - 1e-9:
+            best, best_error = name, error
+    return best
+
+def format_seconds(seconds):
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.1f}us"
+    if seconds < 1:
+        return f"{seconds * 1e3:.2f}ms"
+    return f"{seconds:.2f}s"
+
+def compare_benchmarks(previous, current):
+    previous_sizes = {r['size']: r for r in previous['results']}
+    common = [r for r in current['results'] if r['size'] in previous_sizes]
+    if not common:
+        return 'No common input sizes with the previous benchmark.'
+    latest = common[-1]
+    before = previous_sizes[latest['size']]['median']
+    ratio = before / latest['median'] if latest['median'] else float('inf')
+    verdict = 'faster' if ratio >= 1 else 'slower'
+    factor = ratio if ratio >= 1 else 1 / ratio
+    return (f"At n={latest['size']}: {format_seconds(latest['median'])} vs {format_seconds(before)} before "
+            f"({factor:.2f}x {verdict}), {previous['complexity']} -> {current['complexity']}")
+
+def format_benchmark(benchmark):
+    lines = [f"Benchmark of {benchmark['function']}({benchmark['param']}) with {benchmark['kind']} input: "
+             f"estimated {benchmark['complexity']}",
+             f"{'n':>10}  {'median':>10}  {'p95':>10}  runs"]
+    for r in benchmark['results']:
+        lines.append(f"{r['size']:>10}  {format_seconds(r['median']):>10}  {format_seconds(r['p95']):>10}  {r['runs']}")
+    if benchmark.get('stopped'):
+        lines.append('Stopped at the time budget; the next input size did not finish.')
+    return '\n'.join(lines)
+
+class BenchmarkRun(QObject):
+    output = pyqtSignal(str)
+    completed = pyqtSignal(dict)
+    failed = pyqtSignal(str)
+
+    def __init__(self, venv_python, file_path, function, param, kind, min_repeats=MIN_REPEATS, max_repeats=MAX_REPEATS,
+                 budget=10.0, parent=None):
+        super().__init__(parent)
+        self.venv_python = venv_python
+        self.file_path = file_path
+        self.benchmark = {'function': function, 'param': param, 'kind': kind, 'file': file_path}
+        self.min_repeats = min_repeats
+        self.max_repeats = max_repeats
+        self.budget = budget
+        fd, self.out_path = tempfile.mkstemp(prefix='benchmark_', suffix='.json')
+        os.close(fd)
+        self.timed_out = False
+        self.kill_timer = QTimer(self)
+        self.kill_timer.setSingleShot(True)
+        self.kill_timer.timeout.connect(self.kill)
+
+        self.process = QProcess(self)
+        self.process.setProcessChannelMode(QProcess.MergedChannels)
+        self.process.setWorkingDirectory(os.path.dirname(file_path))
+        self.process.readyReadStandardOutput.connect(self.handle_stdout)
+        self.process.finished.connect(self.process_finished)
+
+        env = QProcessEnvironment.systemEnvironment()
+        env.insert("PYTHONUNBUFFERED", "1")
+        self.process.setProcessEnvironment(env)
+
+    def start(self):
+        self.process.start(self.venv_python, ['-c', BENCHMARK_RUNNER, self.file_path, self.benchmark['function'],
+                                              self.benchmark['param'], self.benchmark['kind'], str(self.min_repeats),
+                                              str(self.max_repeats), str(self.budget), self.out_path])
+        # Generated scripts often prompt for input at import time; give them EOF instead of hanging.
+        self.process.closeWriteChannel()
+        self.kill_timer.start(int((self.budget + KILL_GRACE_SECONDS) * 1000))
+
+    def kill(self):
+        if self.process.state() != QProcess.NotRunning:
+            self.timed_out = True
+            self.output.emit(f'Benchmark exceeded its {self.budget:.0f}s budget, stopping it.')
+            self.process.kill()
+
+    def handle_stdout(self):
+        self.output.emit(self.process.readAllStandardOutput().data().decode(errors='replace'))
+
+    def process_finished(self):
+        self.kill_timer.stop()
+        try:
+            with open(self.out_path, 'r') as file:
+                results = json.load(file)
+            if not results:
+                raise ValueError('no rounds finished')
+        except (OSError, ValueError):
+            if self.timed_out:
+                self.failed.emit('Benchmark was stopped before the first input size finished.')
+            else:
+                self.failed.emit(f'Benchmark did not produce results (exit code {self.process.exitCode()}).')
+            return
+        finally:
+            self.deleteLater()
+            if os.path.exists(self.out_path):
+                os.remove(self.out_path)
+        self.benchmark['results'] = results
+        self.benchmark['complexity'] = estimate_complexity(results)
+        self.benchmark['stopped'] = self.timed_out
+        self.benchmark['time'] = time.time()
+        self.completed.emit(self.benchmark)
+
+def ask_entry(parent, source):
+    signatures = {name: params for name, params in function_signatures(source).items() if params}
+    if not signatures:
+        return None
+    function, ok = QInputDialog.getItem(parent, 'Benchmark', 'Entry function:', list(signatures), 0, False)
+    if not ok:
+        return None
+    param, ok = QInputDialog.getItem(parent, 'Benchmark', 'Parameter that controls the input size:', signatures[function], 0, False)
+    if not ok:
+        return None
+    kind, ok = QInputDialog.getItem(parent, 'Benchmark', f'Type of {param}:', INPUT_KINDS, 0, False)
+    if not ok:
+        return None
+    return function, param, kind
+
+def start_benchmark(parent, venv_python, file_path, output_display, task_node=None, on_recorded=None):
+    # Results are appended to task_node.task['benchmarks'] so a later run (for example after
+    # a refactor) can be compared against the previous one before the task is approved;
+    # on_recorded is then called so the task tree can show the new result.
+    with open(file_path, 'r') as file:
+        source = file.read()
+    entry = infer_entry(source) or ask_entry(parent, source)
+    if entry is None:
+        output_display.append('Benchmark cancelled: no function to benchmark.')
+        return None
+    function, param, kind = entry
+
+    def show_results(benchmark):
+        output_display.append(format_benchmark(benchmark))
+        if task_node is None:
+            return
+        history = task_node.task.setdefault('benchmarks', [])
+        previous = [b for b in history if b['function'] == function and b['kind'] == kind]
+        if previous:
+            output_display.append(f"Compared with the previous benchmark: {compare_benchmarks(previous[-1], benchmark)}")
+        history.append(benchmark)
+        if on_recorded:
+            on_recorded()
+
+    output_display.append(f"Benchmarking {function}({param}) with growing {kind} inputs...")
+    run = BenchmarkRun(venv_python, file_path, function, param, kind, parent=parent)
+    run.output.connect(output_display.append)
+    run.failed.connect(output_display.append)
+    run.completed.connect(show_results)
+    run.start()
+    return run
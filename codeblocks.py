@@ -0,0 +1,69 @@
+# codeblocks.py
+import re
+
+# One pass over the response: an optional filename line right above the fence
+# (e.g. "**utils.py**", "`utils.py`:", "### utils.py"), the fence's language tag and
+# info string, then the body up to the closing fence. Each part of the filename prefix
+# is optional rather than repeated, and a leading "__" only counts as bold when it is
+# closed after the extension, so separator lines like "________" can't make the match
+# backtrack exponentially and __init__.py keeps its name.
+CODE_BLOCK_RE = re.compile(
+    r'(?:^[ \t]*(?:#{1,6}[ \t]+)?(?:[*`]+|__(?=[^\n]*\.[A-Za-z0-9]+__))?(?:File(?:name)?:[ \t]*)?(?P<hint>[\w./-]+\.[A-Za-z0-9]+)[*_`]*:?[ \t]*\n(?:[ \t]*\n)?)?'
+    r'^[ \t]*```[ \t]*(?P<lang>[\w+#.-]*)[ \t]*(?P<info>[^\n]*)\n'
+    r'(?P<code>.*?)\n?^[ \t]*```[ \t]*$',
+    re.DOTALL | re.MULTILINE)
+
+INFO_HINT_RE = re.compile(r'(?:(?:title|file|filename|name)=)?["\']?(?P<hint>[\w./-]+\.\w+)["\']?')
+FIRST_LINE_HINT_RE = re.compile(r'^[ \t]*(?:#|//|--)[ \t]*(?:file(?:name)?:[ \t]*)?(?P<hint>[\w./-]+\.\w+)[ \t]*$', re.IGNORECASE)
+
+LANGUAGE_ALIASES = {
+    'py': 'python', 'python3': 'python', 'js': 'javascript', 'ts': 'typescript',
+    'sh': 'bash', 'shell': 'bash', 'yml': 'yaml', 'md': 'markdown', 'txt': 'text', '': 'text'
+}
+
+LANGUAGE_EXTENSIONS = {
+    'python': '.py', 'javascript': '.js', 'typescript': '.ts', 'bash': '.sh', 'json': '.json',
+    'yaml': '.yaml', 'toml': '.toml', 'ini': '.ini', 'html': '.html', 'css': '.css',
+    'sql': '.sql', 'markdown': '.md', 'text': '.txt'
+}
+
+class CodeBlock:
+    def __init__(self, language, code, filename=None):
+        self.language = language
+        self.code = code
+        self.filename = filename
+
+    @property
+    def extension(self):
+        return LANGUAGE_EXTENSIONS.get(self.language, '.txt')
+
+    def __repr__(self):
+        return f"CodeBlock({self.language!r}, filename={self.filename!r}, {len(self.code)} chars)"
+
+def extract_blocks(text):
+    blocks = []
+    for match in CODE_BLOCK_RE.finditer(text):
+        lang = match.group('lang').lower()
+        language = LANGUAGE_ALIASES.get(lang, lang)
+        code = match.group('code')
+
+        filename = match.group('hint')
+        if not filename and match.group('info'):
+            info_match = INFO_HINT_RE.search(match.group('info'))
+            if info_match:
+                filename = info_match.group('hint')
+        if not filename:
+            first_line = code.split('\n', 1)[0]
+            line_match = FIRST_LINE_HINT_RE.match(first_line)
+            if line_match:
+                filename = line_match.group('hint')
+
+        blocks.append(CodeBlock(language, code, filename))
+    return blocks
+
+def split_primary(blocks):
+    # The first python block is the task's own code; everything else gets its own file.
+    for i, block in enumerate(blocks):
+        if block.language == 'python':
+            return block, blocks[:i] + blocks[i + 1:]
+    return None, list(blocks)
@@ -0,0 +1,164 @@
+# filewriter.py
+import os
+import hashlib
+import tempfile
+import threading
+import time
+import traceback
+
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+def hash_content(content):
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+def atomic_write(path, content):
+    # Write to a temp file in the same directory and rename over the target, so a crash
+    # leaves either the old file or the new one, never a partial write.
+    directory = os.path.dirname(path) or '.'
+    mode = os.stat(path).st_mode & 0o777 if os.path.exists(path) else 0o666 & ~_UMASK
+    fd, tmp_path = tempfile.mkstemp(prefix='.' + os.path.basename(path) + '.', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as file:
+            file.write(content)
+            file.flush()
+            os.fsync(file.fileno())
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+class WriteError(OSError):
+    # Raised by flush() for queued writes that failed in the background.
+    def __init__(self, errors):
+        self.errors = errors  # path -> exception
+        super().__init__('; '.join(f"could not write {path}: {error}" for path, error in errors.items()))
+
+class WriteBehindWriter:
+    def __init__(self, delay=0.25, on_written=None, on_failed=None):
+        self.delay = delay
+        self.on_written = on_written
+        self.on_failed = on_failed  # called with (path, exception) from the writer thread
+        self.pending = {}   # path -> (content, time queued)
+        self.hashes = {}    # path -> (hash, size, mtime) of the content last seen on disk
+        self.writing = set()
+        self.errors = {}    # path -> exception from the last failed write, until flush() reports it
+        self.condition = threading.Condition()
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name='WriteBehindWriter', daemon=True)
+        self.thread.start()
+
+    def write(self, path, content):
+        path = os.path.abspath(path)
+        with self.condition:
+            # A newer save of the same file replaces the queued one.
+            self.pending[path] = (content, time.monotonic())
+            self.condition.notify()
+
+    def is_queued(self, path):
+        with self.condition:
+            return self._busy(os.path.abspath(path))
+
+    def has_failed(self, path):
+        with self.condition:
+            return os.path.abspath(path) in self.errors
+
+    def flush(self, path=None):
+        # Blocks until the given file (or every queued file) is on disk, and raises
+        # WriteError if any of those writes failed.
+        with self.condition:
+            if path is not None:
+                path = os.path.abspath(path)
+            while self._busy(path):
+                if path is None:
+                    for key, (content, _) in self.pending.items():
+                        self.pending[key] = (content, 0)
+                elif path in self.pending:
+                    self.pending[path] = (self.pending[path][0], 0)
+                self.condition.notify_all()
+                self.condition.wait(0.05)
+            failed = {p: e for p, e in self.errors.items() if path is None or p == path}
+            for p in failed:
+                del self.errors[p]
+        if failed:
+            raise WriteError(failed)
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            with self.condition:
+                self.running = False
+                self.condition.notify_all()
+            self.thread.join()
+
+    def _busy(self, path):
+        if path is None:
+            return bool(self.pending or self.writing)
+        return path in self.pending or path in self.writing
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while self.running and not self._due():
+                    self.condition.wait(self._wait_time())
+                if not self.running and not self.pending:
+                    return
+                now = time.monotonic()
+                due = [path for path, (_, queued) in self.pending.items() if now - queued >= self.delay or not self.running]
+                batch = [(path, self.pending.pop(path)[0]) for path in due]
+                self.writing.update(due)
+
+            for path, content in batch:
+                try:
+                    self._write(path, content)
+                    with self.condition:
+                        self.errors.pop(path, None)
+                except Exception as e:
+                    traceback.print_exc()
+                    with self.condition:
+                        self.errors[path] = e
+                    if self.on_failed:
+                        self.on_failed(path, e)
+                finally:
+                    with self.condition:
+                        self.writing.discard(path)
+                        self.condition.notify_all()
+
+    def _due(self):
+        now = time.monotonic()
+        return any(now - queued >= self.delay for _, queued in self.pending.values())
+
+    def _wait_time(self):
+        if not self.pending:
+            return None
+        oldest = min(queued for _, queued in self.pending.values())
+        return max(0.0, self.delay - (time.monotonic() - oldest))
+
+    def _write(self, path, content):
+        content_hash = hash_content(content)
+        if self._disk_hash(path) == content_hash:
+            print(f"Skipped unchanged file: {path}")
+            return
+        atomic_write(path, content)
+        stat = os.stat(path)
+        self.hashes[path] = (content_hash, stat.st_size, stat.st_mtime)
+        print(f"Updated file: {path}")
+        if self.on_written:
+            self.on_written(path)
+
+    def _disk_hash(self, path):
+        # The cached hash is reused while the file's size and mtime still match our last write.
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        cached = self.hashes.get(path)
+        if cached and cached[1:] == (stat.st_size, stat.st_mtime):
+            return cached[0]
+        with open(path, 'r', encoding='utf-8', errors='replace') as file:
+            content_hash = hash_content(file.read())
+        self.hashes[path] = (content_hash, stat.st_size, stat.st_mtime)
+        return content_hash
@@ -0,0 +1,170 @@
+# lifecycle.py
+import os
+import sys
+import time
+from PyQt5 import sip
+from PyQt5.QtCore import Qt, QObject, QProcess, QTimer, pyqtSignal
+
+REAP_INTERVAL_MS = 30 * 1000
+KILL_GRACE_MS = 2000
+
+def process_memory():
+    # Current resident memory of this process in bytes, or None when the platform gives no
+    # cheap answer (see peak_memory).
+    if sys.platform == 'win32':
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD),
+                        ('PeakWorkingSetSize', ctypes.c_size_t), ('WorkingSetSize', ctypes.c_size_t),
+                        ('QuotaPeakPagedPoolUsage', ctypes.c_size_t), ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                        ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t), ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                        ('PagefileUsage', ctypes.c_size_t), ('PeakPagefileUsage', ctypes.c_size_t)]
+
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        if ctypes.windll.psapi.GetProcessMemoryInfo(ctypes.windll.kernel32.GetCurrentProcess(),
+                                                    ctypes.byref(counters), counters.cb):
+            return counters.WorkingSetSize
+        return None
+    try:
+        with open('/proc/self/statm', 'r') as file:
+            return int(file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+def peak_memory():
+    # Peak resident memory in bytes, for platforms without a cheap current figure (macOS).
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+    except (ImportError, OSError):
+        return None
+
+class ResourceManager(QObject):
+    # Owns the lifetime of subtask windows and child processes: closed windows are deleted,
+    # a new run replaces the previous one from the same owner, and processes that outlive
+    # their owner are killed. Long runs of a live owner (a game, a server) are left alone.
+    changed = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.windows = []
+        self.processes = {}  # QProcess -> (owner, start time)
+        self.reap_timer = QTimer(self)
+        self.reap_timer.timeout.connect(self.reap_stale)
+        self.reap_timer.start(REAP_INTERVAL_MS)
+
+    def track_window(self, window, on_release=None):
+        window.setAttribute(Qt.WA_DeleteOnClose)
+        self.windows.append(window)
+
+        def released(*args):
+            if sip.isdeleted(self):
+                return
+            if window in self.windows:
+                self.windows.remove(window)
+            self.kill_processes(window)
+            if on_release:
+                on_release(window)
+            self.changed.emit()
+
+        window.destroyed.connect(released)
+        self.changed.emit()
+
+    def close_windows(self):
+        for window in list(self.windows):
+            window.close()
+
+    def track_process(self, process, owner):
+        self.processes[process] = (owner, time.monotonic())
+        process.finished.connect(lambda *args, p=process: self._process_finished(p))
+        process.destroyed.connect(lambda *args, p=process: self._forget(p))
+        self.changed.emit()
+
+    def start_process(self, owner, process, program, args):
+        # Only one plain run per owner: starting another stops the one before it.
+        for previous, (previous_owner, _) in list(self.processes.items()):
+            if previous_owner is owner and previous.property('run_slot') == 'run':
+                # The owner's handlers now belong to the new run; the old process must not
+                # report its end (or late output) to them.
+                self.stop_process(previous, silence=True)
+        process.setProperty('run_slot', 'run')
+        self.track_process(process, owner)
+        process.start(program, args)
+
+    def stop_process(self, process, silence=False):
+        if process not in self.processes:
+            return
+        if sip.isdeleted(process):
+            self._forget(process)
+            return
+        if silence:
+            # This also blocks our own finished handler; _kill_if_running releases it instead.
+            process.blockSignals(True)
+        if process.state() != QProcess.NotRunning:
+            process.terminate()
+            QTimer.singleShot(KILL_GRACE_MS, lambda p=process: self._kill_if_running(p))
+        else:
+            self._process_finished(process)
+
+    def stop_processes(self, owner=None):
+        for process, (process_owner, _) in list(self.processes.items()):
+            if owner is None or process_owner is owner:
+                self.stop_process(process)
+
+    def kill_processes(self, owner):
+        # The owner is being destroyed and takes its child processes with it, so there is
+        # no time for a graceful terminate.
+        for process, (process_owner, _) in list(self.processes.items()):
+            if process_owner is owner:
+                del self.processes[process]
+                if not sip.isdeleted(process) and process.state() != QProcess.NotRunning:
+                    process.blockSignals(True)
+                    process.kill()
+                    process.waitForFinished(KILL_GRACE_MS)
+
+    def reap_stale(self):
+        # Only orphans: a process whose window or tab is gone can't be seen or stopped any more.
+        for process, (owner, started) in list(self.processes.items()):
+            if sip.isdeleted(owner):
+                if not sip.isdeleted(process):
+                    print(f"Stopping orphaned process {process.program()} (pid {process.processId()})")
+                self.stop_process(process)
+
+    def running_count(self):
+        return sum(1 for process in self.processes
+                   if not sip.isdeleted(process) and process.state() != QProcess.NotRunning)
+
+    def status_text(self):
+        memory, label = process_memory(), 'Memory'
+        if memory is None:
+            memory, label = peak_memory(), 'Peak memory'
+        memory_text = f"{memory / (1024 * 1024):.1f} MiB" if memory is not None else 'n/a'
+        return f"{label}: {memory_text} | Child processes: {self.running_count()} | Subtask windows: {len(self.windows)}"
+
+    def _kill_if_running(self, process):
+        if process not in self.processes:
+            return
+        if sip.isdeleted(process):
+            self._forget(process)
+            return
+        if process.state() != QProcess.NotRunning:
+            process.kill()
+            if process.signalsBlocked():
+                process.waitForFinished(KILL_GRACE_MS)
+        if process.signalsBlocked():
+            self._process_finished(process)
+
+    def _process_finished(self, process):
+        if process in self.processes:
+            del self.processes[process]
+            if not sip.isdeleted(process):
+                process.deleteLater()
+            self.changed.emit()
+
+    def _forget(self, process):
+        if self.processes.pop(process, None) is not None:
+            self.changed.emit()
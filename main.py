@@ -1,9 +1,9 @@
 import sys
 import os
 import time
-from PyQt5.QtWidgets import QApplication, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QTextEdit, QLineEdit, QLabel, QMessageBox, QProgressBar, QTabWidget, QGraphicsEllipseItem, QGraphicsTextItem, QDesktopWidget, QSizePolicy, QDialog, QGraphicsView, QGraphicsScene
+from PyQt5.QtWidgets import QApplication, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QTextEdit, QLineEdit, QLabel, QMessageBox, QProgressBar, QTabWidget, QGraphicsEllipseItem, QGraphicsTextItem, QDesktopWidget, QSizePolicy, QDialog, QGraphicsView, QGraphicsScene, QCompleter, QCheckBox, QStatusBar, QListWidget, QListWidgetItem
 from PyQt5.QtGui import QColor, QBrush, QPainter
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QStringListModel, QTimer
 from PyQt5.Qsci import QsciScintilla, QsciLexerPython
 from PyQt5.QtCore import QProcess, QProcessEnvironment
 import traceback
@@ -11,6 +11,17 @@ import subprocess
 import google.generativeai as genai
 from highlighter import PythonHighlighter
 from projectmanager import ProjectManager
+from codeblocks import CodeBlock, extract_blocks, split_primary
+from structured import STRUCTURED_PROMPT, StructuredResponseError, parse_structured_response
+from similarity import SimilarityIndex
+from profiler import start_profile
+from benchmark import start_benchmark, format_seconds
+from perfrefactor import CANDIDATES, MIN_SPEEDUP, RefactorRefused, performance_refactor, format_refactor_report
+from stubs import pack_interfaces, assemble_modules
+from lifecycle import ResourceManager
+from searchindex import SearchIndex
+from filewriter import WriteError
+from concurrent.futures import ThreadPoolExecutor
 import re
 import configparser
 
@@ -20,11 +31,54 @@ def load_api_key(f='api_key.txt'):
     return config.get('GOOGLE', 'api_key')
 
 def extract_code(text):
-    code_block = re.search(r'```python\n(.*?)\n```', text, re.DOTALL)
-    if code_block:
-        return code_block.group(1)
+    primary, _ = split_primary(extract_blocks(text))
+    if primary:
+        return primary.code
     return ''
 
+def ask_reuse(parent, entry, score):
+    box = QMessageBox(parent)
+    box.setWindowTitle('Similar Prompt Found')
+    box.setText(f"A previously approved prompt is {score:.0%} similar:\n\n{entry['prompt'][:500]}")
+    box.setDetailedText(entry['code'])
+    reuse_button = box.addButton('Reuse Code', QMessageBox.AcceptRole)
+    seed_button = box.addButton('Use as Starting Point', QMessageBox.ActionRole)
+    box.addButton('Generate New', QMessageBox.RejectRole)
+    box.exec_()
+    if box.clickedButton() == reuse_button:
+        return 'reuse'
+    if box.clickedButton() == seed_button:
+        return 'seed'
+    return None
+
+SEED_MARKER = "\n\nA similar task was solved before with the following code. Reuse as much of it as fits:\n"
+
+def seed_prompt(prompt, code):
+    return f"{prompt}{SEED_MARKER}```python\n{code}\n```"
+
+def unseeded_prompt(prompt):
+    return prompt.split(SEED_MARKER, 1)[0]
+
+def flush_or_report(parent, project_manager, file_path=None):
+    # Queued saves are written in the background; only paths that are about to run or
+    # read the files wait for them here, so a failed write surfaces before it matters.
+    try:
+        project_manager.flush(file_path)
+        return True
+    except WriteError as e:
+        QMessageBox.critical(parent, 'Error', f'An error occurred while saving: {str(e)}')
+        return False
+
+def connect_write_failures(parent, project_manager):
+    # Plain saves don't wait for the disk. A failure is reported when the writer hits it,
+    # unless a flush got to it first and has already shown it.
+    def report(path, error):
+        if project_manager.writer.has_failed(path):
+            QMessageBox.critical(parent, 'Error', f'Could not save {os.path.basename(path)}: {error}')
+    project_manager.index.write_failed.connect(report)
+
+INTERFACE_MARKER = "\n\nThe following approved subtasks will be combined with this one. Use their interfaces as shown and do not reimplement them:\n"
+
 class TaskNode:
     def __init__(self, task, parent=None):
         self.task = task
@@ -35,6 +89,8 @@ class TaskNode:
         self.children.append(task_node)
 
     def get_task_filename(self):
+        if self.task.get('filename'):
+            return self.task['filename']
         if self.parent is None:
             return self.task['prompt']
         else:
@@ -44,9 +100,10 @@ class TaskNode:
         
 
 class SubtaskWindow(QWidget):
-    def __init__(self, subtask, project_manager, parent_window, main_task_filename, subtask_number, total_subtasks):
+    def __init__(self, subtask, project_manager, parent_window, main_task_filename, subtask_number, total_subtasks, task_node=None):
         super().__init__()
         self.subtask = subtask
+        self.task_node = task_node
         self.project_manager = project_manager
         self.parent_window = parent_window
         self.main_task_filename = main_task_filename
@@ -60,12 +117,14 @@ class SubtaskWindow(QWidget):
         
         layout = QVBoxLayout()
         
-        subtask_text_edit = QTextEdit()
-        subtask_text_edit.setPlainText(subtask)
-        layout.addWidget(subtask_text_edit)
+        self.included_subtasks = []
+
+        self.subtask_text_edit = QTextEdit()
+        self.subtask_text_edit.setPlainText(subtask)
+        layout.addWidget(self.subtask_text_edit)
 
         submit_button = QPushButton("Submit")
-        submit_button.clicked.connect(lambda: self.submit_subtask(subtask_text_edit.toPlainText()))
+        submit_button.clicked.connect(lambda: self.submit_subtask(self.subtask_text_edit.toPlainText()))
         layout.addWidget(submit_button)
 
         code_label = QLabel("Code:")
@@ -79,7 +138,15 @@ class SubtaskWindow(QWidget):
         
         self.execute_button = QPushButton("Execute")
         self.execute_button.clicked.connect(self.execute_subtask)
-        layout.addWidget(self.execute_button)
+        self.profile_button = QPushButton("Profile")
+        self.profile_button.clicked.connect(self.profile_subtask)
+        self.benchmark_button = QPushButton("Benchmark")
+        self.benchmark_button.clicked.connect(self.benchmark_subtask)
+        run_buttons_layout = QHBoxLayout()
+        run_buttons_layout.addWidget(self.execute_button)
+        run_buttons_layout.addWidget(self.profile_button)
+        run_buttons_layout.addWidget(self.benchmark_button)
+        layout.addLayout(run_buttons_layout)
 
         self.output_display = QTextEdit()
         self.output_display.setReadOnly(True)
@@ -99,51 +166,111 @@ class SubtaskWindow(QWidget):
         self.setWindowState(self.windowState() & ~Qt.WindowMinimized | Qt.WindowActive)
         self.activateWindow()
 
+    def similarity_key(self, subtask):
+        subtask = subtask.split(INTERFACE_MARKER, 1)[0]
+        if self.task_node and subtask == self.subtask:
+            return self.task_node.task.get('subtask', subtask)
+        return subtask
+
     def submit_subtask(self, subtask):
         try:
+            entry, score = self.parent_window.similarity_index.find(self.similarity_key(subtask), 'subtask')
+            if entry:
+                choice = ask_reuse(self, entry, score)
+                if choice == 'reuse':
+                    self.set_generated_code(entry['code'])
+                    self.output_display.append(f'Reused approved code from a {score:.0%} similar subtask.')
+                    return
+                if choice == 'seed':
+                    subtask = seed_prompt(subtask, entry['code'])
+
             response = self.parent_window.model.generate_content(subtask)
-            generated_code = extract_code(response.text)
-            self.code_display.setText(generated_code)
-            self.save_subtask()
+            primary, extra_blocks = split_primary(extract_blocks(response.text))
+            self.set_generated_code(primary.code if primary else '')
+            self.save_extra_blocks(extra_blocks)
         except Exception as e:
             print(traceback.print_exc())
             QMessageBox.critical(self, 'Error', f'An error occurred while submitting subtask: {str(e)}')
 
-    def save_subtask(self):
+    def set_generated_code(self, generated_code, notify=True):
+        self.code_display.setText(generated_code)
+        if self.task_node:
+            self.task_node.task['code'] = generated_code
+            self.parent_window.index_task(self.task_node)
+        self.save_subtask(notify)
+
+    def save_subtask(self, notify=True):
         code = self.code_display.text()
         if code.strip():
             try:
                 main_filename = os.path.splitext(self.main_task_filename)[0]
                 new_filename = f"{main_filename}-{self.subtask_number}.py"
                 file_path = os.path.join(self.project_manager.project_dir, new_filename)
-                with open(file_path, 'w') as file:
-                    file.write(code)
-                QMessageBox.information(self, 'Success', f'Subtask saved successfully as {new_filename}')
+                self.project_manager.write_to_file(code, file_path)
+                if notify:
+                    QMessageBox.information(self, 'Success', f'Subtask saved successfully as {new_filename}')
+                else:
+                    self.output_display.append(f'Subtask saved as {new_filename}')
             except Exception as e:
                 print(traceback.print_exc())
                 QMessageBox.critical(self, 'Error', f'An error occurred while saving subtask: {str(e)}')
         else:
             QMessageBox.warning(self, 'Warning', 'No code to save for this subtask.')
 
+    def save_extra_blocks(self, blocks):
+        if not blocks:
+            return
+        main_filename = os.path.splitext(self.main_task_filename)[0]
+        primary_path = os.path.join(self.project_manager.project_dir, f"{main_filename}-{self.subtask_number}.py")
+        for path in self.project_manager.write_code_blocks(blocks, primary_path, self.task_node):
+            self.output_display.append(f"Saved additional file: {os.path.relpath(path, self.project_manager.project_dir)}")
+
     def execute_subtask(self):
         try:
             code = self.code_display.text()
             if code.strip():
-                main_filename = os.path.splitext(self.main_task_filename)[0]
-                filename = f"{main_filename}-{self.subtask_number}.py"
-                file_path = os.path.join(self.project_manager.project_dir, filename)
-                self.run_code(file_path)
+                self.run_code(self.runnable_path())
             else:
                 QMessageBox.warning(self, 'Warning', 'No code to execute for this subtask.')
         except Exception as e:
             print(traceback.print_exc())
             QMessageBox.critical(self, 'Error', f'An error occurred while executing subtask: {str(e)}')
 
+    def profile_subtask(self):
+        code = self.code_display.text()
+        if code.strip():
+            try:
+                file_path = self.runnable_path()
+            except WriteError as e:
+                QMessageBox.critical(self, 'Error', f'An error occurred while saving: {str(e)}')
+                return
+            profile_run = start_profile(self, self.project_manager.venv_python(), file_path, self.project_manager.project_dir, self.output_display)
+            self.parent_window.resources.track_process(profile_run.process, self)
+        else:
+            QMessageBox.warning(self, 'Warning', 'No code to profile for this subtask.')
+
+    def benchmark_subtask(self):
+        code = self.code_display.text()
+        if code.strip():
+            try:
+                file_path = self.runnable_path()
+            except WriteError as e:
+                QMessageBox.critical(self, 'Error', f'An error occurred while saving: {str(e)}')
+                return
+            benchmark_run = start_benchmark(self, self.project_manager.venv_python(), file_path, self.output_display, self.task_node,
+                                            self.parent_window.visualize_tasks)
+            if benchmark_run:
+                self.parent_window.resources.track_process(benchmark_run.process, self)
+        else:
+            QMessageBox.warning(self, 'Warning', 'No code to benchmark for this subtask.')
+
     def run_code(self, file_path):
         try:
             if file_path:
-                venv_dir = os.path.join(self.project_manager.project_dir, 'venv')
-                venv_python = os.path.join(venv_dir, 'Scripts', 'python') if sys.platform == 'win32' else os.path.join(venv_dir, 'bin', 'python')
+                self.project_manager.flush(file_path)
+                venv_python = self.project_manager.venv_python()
+                if self.task_node:
+                    self.task_node.task['output'] = ''
 
                 self.process = QProcess(self)
                 self.process.setProcessChannelMode(QProcess.MergedChannels)
@@ -154,7 +281,7 @@ class SubtaskWindow(QWidget):
                 env.insert("PYTHONUNBUFFERED", "1")
                 self.process.setProcessEnvironment(env)
 
-                self.process.start(venv_python, [file_path])
+                self.parent_window.resources.start_process(self, self.process, venv_python, [file_path])
             else:
                 QMessageBox.warning(self, 'Warning', 'No file opened. Please open a file first.')
         except Exception as e:
@@ -163,33 +290,61 @@ class SubtaskWindow(QWidget):
     def handle_stdout(self):
         data = self.process.readAllStandardOutput().data().decode()
         self.output_display.append(data)
+        if self.task_node:
+            self.task_node.task['output'] += data
 
     def process_finished(self):
         self.output_display.append("Process finished.")
         self.approve_button.setEnabled(True)
+        if self.task_node:
+            self.parent_window.index_task(self.task_node)
 
     def approve_subtask(self):
+        if self.task_node:
+            self.task_node.task['status'] = 'complete'
+        self.parent_window.similarity_index.add(self.similarity_key(self.subtask), self.code_display.text(), 'subtask')
         self.parent_window.subtask_approved(self.subtask_number)
         self.close()
 
+    def subtask_file_path(self, subtask_number=None):
+        main_filename = os.path.splitext(self.main_task_filename)[0]
+        return os.path.join(self.project_manager.project_dir, f"{main_filename}-{subtask_number or self.subtask_number}.py")
+
+    def runnable_path(self):
+        # Included subtasks only reach the prompt as interfaces, so running this subtask
+        # needs their full code inlined ahead of it in a separate assembled file.
+        file_path = self.subtask_file_path()
+        self.project_manager.flush()
+        if not self.included_subtasks:
+            return file_path
+        modules = []
+        for number in self.included_subtasks + [self.subtask_number]:
+            with open(self.subtask_file_path(number), 'r') as f:
+                modules.append((f"Subtask #{number}", f.read()))
+        assembled_path = f"{os.path.splitext(file_path)[0]}-assembled.py"
+        if self.task_node:
+            self.project_manager.index.register_origin(assembled_path, self.task_node)
+        self.project_manager.write_to_file(assemble_modules(modules), assembled_path)
+        self.project_manager.flush(assembled_path)
+        return assembled_path
+
     def include_subtask(self, subtask_number):
-        approved_subtask_file = f"{os.path.splitext(self.main_task_filename)[0]}-{subtask_number}.py"
-        approved_subtask_path = os.path.join(self.project_manager.project_dir, approved_subtask_file)
-        
-        with open(approved_subtask_path, 'r') as f:
-            approved_code = f.read()
-        
-        current_code = self.code_display.text()
-        updated_code = f"""# Including code from subtask #{subtask_number}
-# Begin included code
-{approved_code}
-# End included code
-
-# Original code for this subtask
-{current_code}"""
-        
-        self.code_display.setText(updated_code)
-        QMessageBox.information(self, 'Subtask Included', f'Code from subtask #{subtask_number} has been included in this subtask.')
+        if subtask_number in self.included_subtasks:
+            QMessageBox.information(self, 'Subtask Included', f'Subtask #{subtask_number} is already included in this subtask.')
+            return
+        self.included_subtasks.append(subtask_number)
+        self.update_included_interfaces()
+        QMessageBox.information(self, 'Subtask Included', f'The interface of subtask #{subtask_number} has been added to this subtask\'s prompt. Its full code is inlined when the subtasks are combined.')
+
+    def update_included_interfaces(self):
+        if not flush_or_report(self, self.project_manager):
+            return
+        modules = []
+        for number in sorted(self.included_subtasks):
+            with open(self.subtask_file_path(number), 'r') as f:
+                modules.append((f"Subtask #{number} ({os.path.basename(self.subtask_file_path(number))})", f.read()))
+        prompt = self.subtask_text_edit.toPlainText().split(INTERFACE_MARKER, 1)[0]
+        self.subtask_text_edit.setPlainText(f"{prompt}{INTERFACE_MARKER}```python\n{pack_interfaces(modules)}\n```")
 
 
 class CodeGenApp(QWidget):
@@ -203,6 +358,11 @@ class CodeGenApp(QWidget):
 
         self.task_tree_view = TaskTreeView()
 
+        self.similarity_index = SimilarityIndex(os.path.join(os.getcwd(), 'prompt_index.json'))
+        self.resources = ResourceManager(self)
+        self.search_index = SearchIndex()
+        self.output_node = None
+
         genai.configure(api_key=load_api_key())
         self.model = genai.GenerativeModel('gemini-1.5-flash')
         self.setWindowTitle('Code Generation App')
@@ -212,11 +372,13 @@ class CodeGenApp(QWidget):
         self.tab_widget = QTabWidget()
         self.code_gen_tab = QWidget()
         self.task_tree_tab = QWidget()
+        self.search_tab = QWidget()
 
         self.new_project_tab = NewProjectTab(self)
         self.tab_widget.addTab(self.code_gen_tab, 'Code Generation')
         self.tab_widget.addTab(self.task_tree_tab, 'Task Tree')
         self.tab_widget.addTab(self.new_project_tab, 'New Project')
+        self.tab_widget.addTab(self.search_tab, 'Search')
 
         code_gen_layout = QVBoxLayout()
         task_tree_layout = QVBoxLayout()
@@ -227,6 +389,7 @@ class CodeGenApp(QWidget):
         self.prompt_input = QTextEdit()
         self.submit_button = QPushButton('Submit')
         self.submit_button.clicked.connect(self.handleSubmit)
+        self.single_request_checkbox = QCheckBox('Single request (generate subtasks and their code together)')
 
         self.complete_output_label = QLabel('Complete Output:')
         self.complete_output_display = QTextEdit()
@@ -244,16 +407,22 @@ class CodeGenApp(QWidget):
 
         self.approve_button = QPushButton('Approve')
         self.refactor_button = QPushButton('Refactor')
+        self.perf_refactor_button = QPushButton('Refactor for Performance')
         self.breakdown_button = QPushButton('Further Breakdown')
         self.delete_button = QPushButton('Delete')
 
         self.approve_button.clicked.connect(self.handleApprove)
         self.refactor_button.clicked.connect(self.handleRefactor)
+        self.perf_refactor_button.clicked.connect(self.handlePerformanceRefactor)
         self.breakdown_button.clicked.connect(self.handleBreakdown)
         self.delete_button.clicked.connect(self.handleDelete)
 
         self.execute_button = QPushButton('Execute')
         self.execute_button.clicked.connect(self.handle_execute)
+        self.profile_button = QPushButton('Profile')
+        self.profile_button.clicked.connect(self.handle_profile)
+        self.benchmark_button = QPushButton('Benchmark')
+        self.benchmark_button.clicked.connect(self.handle_benchmark)
 
         self.progress_bar = QProgressBar()
         self.progress_bar.setVisible(False)
@@ -261,6 +430,7 @@ class CodeGenApp(QWidget):
         self.status_label = QLabel()
 
         self.pm = ProjectManager()
+        connect_write_failures(self, self.pm)
 
         self.create_project_button = QPushButton('Create New Project')
         self.create_project_button.clicked.connect(self.create_new_project)
@@ -276,6 +446,29 @@ class CodeGenApp(QWidget):
         self.open_file_button.clicked.connect(self.open_file)
         self.open_file_button.setEnabled(False)
 
+        self.quick_open_model = QStringListModel()
+        self.quick_open_input = QLineEdit()
+        self.quick_open_input.setPlaceholderText('Quick open file...')
+        quick_open_completer = QCompleter(self.quick_open_model, self)
+        quick_open_completer.setCaseSensitivity(Qt.CaseInsensitive)
+        quick_open_completer.setFilterMode(Qt.MatchContains)
+        self.quick_open_input.setCompleter(quick_open_completer)
+        self.quick_open_input.returnPressed.connect(self.quick_open_file)
+        self.quick_open_input.setEnabled(False)
+        self.pm.index.file_added.connect(self.update_quick_open)
+        self.pm.index.file_removed.connect(self.update_quick_open)
+        self.pm.index.project_opened.connect(self.index_project_files)
+        self.pm.index.file_added.connect(self.index_project_file)
+        self.pm.index.file_changed.connect(self.index_project_file)
+        self.pm.index.file_removed.connect(self.remove_project_file)
+
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText('Search prompts, code, outputs and project files...')
+        self.search_input.textChanged.connect(self.update_search_results)
+        self.search_results = QListWidget()
+        self.search_results.itemActivated.connect(self.open_search_result)
+        self.search_status_label = QLabel()
+
         project_buttons_layout = QHBoxLayout()
         project_buttons_layout.addWidget(self.open_project_button)
         project_buttons_layout.addWidget(self.create_project_button)
@@ -283,12 +476,14 @@ class CodeGenApp(QWidget):
         file_buttons_layout = QHBoxLayout()
         file_buttons_layout.addWidget(self.open_file_button)
         file_buttons_layout.addWidget(self.create_file_button)
+        file_buttons_layout.addWidget(self.quick_open_input)
 
         code_gen_layout.addWidget(self.current_project_label)
         code_gen_layout.addLayout(project_buttons_layout)
         code_gen_layout.addLayout(file_buttons_layout)
         code_gen_layout.addWidget(self.prompt_label)
         code_gen_layout.addWidget(self.prompt_input)
+        code_gen_layout.addWidget(self.single_request_checkbox)
         code_gen_layout.addWidget(self.submit_button)
         code_gen_layout.addWidget(self.complete_output_label)
         code_gen_layout.addWidget(self.complete_output_display)
@@ -296,9 +491,14 @@ class CodeGenApp(QWidget):
         code_gen_layout.addWidget(self.generated_code_display)
         code_gen_layout.addWidget(self.output_label)
         code_gen_layout.addWidget(self.output_display)
-        code_gen_layout.addWidget(self.execute_button)
+        run_buttons_layout = QHBoxLayout()
+        run_buttons_layout.addWidget(self.execute_button)
+        run_buttons_layout.addWidget(self.profile_button)
+        run_buttons_layout.addWidget(self.benchmark_button)
+        code_gen_layout.addLayout(run_buttons_layout)
         code_gen_layout.addWidget(self.approve_button)
         code_gen_layout.addWidget(self.refactor_button)
+        code_gen_layout.addWidget(self.perf_refactor_button)
         code_gen_layout.addWidget(self.breakdown_button)
         code_gen_layout.addWidget(self.delete_button)
         code_gen_layout.addWidget(self.progress_bar)
@@ -306,15 +506,73 @@ class CodeGenApp(QWidget):
 
         task_tree_layout.addWidget(self.task_tree_view)
 
+        search_layout = QVBoxLayout()
+        search_layout.addWidget(self.search_input)
+        search_layout.addWidget(self.search_results)
+        search_layout.addWidget(self.search_status_label)
+
         self.code_gen_tab.setLayout(code_gen_layout)
         self.task_tree_tab.setLayout(task_tree_layout)
+        self.search_tab.setLayout(search_layout)
+
+        self.status_bar = QStatusBar()
+        self.status_bar.setSizeGripEnabled(False)
 
         layout.addWidget(self.tab_widget)
+        layout.addWidget(self.status_bar)
         self.setLayout(layout)
         self.setWindowSize()
 
         self.subtask_windows = []
         self.approved_subtasks = set()
+        self.total_subtasks = 0
+        self.current_main_node = None
+
+        self.resources.changed.connect(self.update_resource_status)
+        self.resource_timer = QTimer(self)
+        self.resource_timer.timeout.connect(self.update_resource_status)
+        self.resource_timer.start(2000)
+        self.update_resource_status()
+
+    def update_resource_status(self):
+        self.status_bar.showMessage(self.resources.status_text())
+
+    def start_task(self):
+        # Windows and approvals belong to a single task; a new task releases the previous one's.
+        # Returns False if the user chose to keep unapproved windows open instead.
+        unapproved = [w for w in self.subtask_windows if w.subtask_number not in self.approved_subtasks]
+        if unapproved:
+            reply = QMessageBox.question(self, 'Start New Task',
+                                         f'{len(unapproved)} subtask window(s) from the previous task are not approved yet. '
+                                         'Starting a new task will close them and discard unsaved prompt edits. Continue?',
+                                         QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
+            if reply != QMessageBox.Yes:
+                return False
+        self.resources.close_windows()
+        self.subtask_windows = []
+        self.approved_subtasks = set()
+        self.total_subtasks = 0
+        self.current_main_node = None
+        return True
+
+    def add_subtask_window(self, subtask_window):
+        self.subtask_windows.append(subtask_window)
+        self.resources.track_window(subtask_window, self.subtask_window_released)
+
+    def subtask_window_released(self, window):
+        if window in self.subtask_windows:
+            self.subtask_windows.remove(window)
+
+    def closeEvent(self, event):
+        # Make sure queued saves reach the disk before the app exits.
+        self.resources.close_windows()
+        self.resources.stop_processes()
+        for pm in (self.pm, self.new_project_tab.pm):
+            try:
+                pm.close()
+            except WriteError as e:
+                QMessageBox.critical(self, 'Error', f'Some files could not be saved: {str(e)}')
+        super().closeEvent(event)
 
     def setWindowSize(self):
         self.setMinimumSize(1024, 768)  # Set minimum width and height
@@ -335,6 +593,8 @@ class CodeGenApp(QWidget):
         self.pm.create_new_project()
         self.create_file_button.setEnabled(True)
         self.open_file_button.setEnabled(True)
+        self.quick_open_input.setEnabled(True)
+        self.update_quick_open()
 
     def open_project(self):
         project_name = self.pm.open_project()
@@ -342,6 +602,8 @@ class CodeGenApp(QWidget):
             self.current_project_label.setText(f'Current Project: {project_name}')
             self.create_file_button.setEnabled(True)
             self.open_file_button.setEnabled(True)
+            self.quick_open_input.setEnabled(True)
+            self.update_quick_open()
 
     def create_new_file(self):
         self.pm.create_new_file()
@@ -353,8 +615,98 @@ class CodeGenApp(QWidget):
             self.generated_code_display.setText(file_content)
             self.submit_button.setEnabled(True)
 
+    def update_quick_open(self, *args):
+        if self.pm.project_dir:
+            self.quick_open_model.setStringList(self.pm.index.names())
+
+    def quick_open_file(self):
+        name = self.quick_open_input.text().strip()
+        if name and self.show_indexed_file(name):
+            self.quick_open_input.clear()
+
+    def show_indexed_file(self, name):
+        file_content = self.pm.open_indexed_file(name)
+        if file_content is None:
+            return False
+        self.generated_code_display.setText(file_content)
+        self.submit_button.setEnabled(True)
+        origin = self.pm.index.origin_of(self.pm.current_file_path)
+        if isinstance(origin, TaskNode):
+            self.current_node = origin
+        return True
+
+    def task_title(self, node):
+        text = (node.task.get('subtask') or node.task['prompt']).strip()
+        title = text.splitlines()[0][:60] if text else 'Untitled task'
+        return f"{title} ({node.task['filename']})" if node.task.get('filename') else title
+
+    def index_task(self, node):
+        # Called wherever a task's prompt, code or output changes, so search never walks the tree.
+        self.search_index.index_task(node, self.task_title(node))
+        self.update_search_results()
+
+    def index_project_files(self, project_dir):
+        self.search_index.remove_files()
+        for path in self.pm.index.files:
+            self.search_index.index_file(path, os.path.relpath(path, project_dir))
+        self.update_search_results()
+
+    def index_project_file(self, path):
+        if self.pm.project_dir:
+            self.search_index.index_file(path, os.path.relpath(path, self.pm.project_dir))
+            self.update_search_results()
+
+    def remove_project_file(self, path):
+        self.search_index.remove_file(path)
+        self.update_search_results()
+
+    def update_search_results(self, *args):
+        query = self.search_input.text()
+        self.search_results.clear()
+        if not query.strip():
+            self.search_status_label.setText('')
+            return
+        results = self.search_index.search(query)
+        for result in results:
+            document = result.document
+            where = 'file' if document.kind == 'file' else f"task {document.field}"
+            item = QListWidgetItem(f"{document.title}  [{where}]\n    {result.snippet}")
+            item.setData(Qt.UserRole, result)
+            self.search_results.addItem(item)
+        self.search_status_label.setText(f"{len(results)} result(s)" if results else 'No matches.')
+
+    def open_search_result(self, item):
+        document = item.data(Qt.UserRole).document
+        if document.kind == 'file':
+            if not self.show_indexed_file(document.target):
+                return
+        else:
+            node = document.target
+            self.current_node = node
+            self.generated_code_display.setText(node.task.get('code', ''))
+            self.complete_output_display.setText(node.task['prompt'])
+            if node.task.get('output'):
+                self.output_display.setText(node.task['output'])
+        self.tab_widget.setCurrentWidget(self.code_gen_tab)
+
     def handleSubmit(self):
         prompt = self.prompt_input.toPlainText()
+        entry, score = self.similarity_index.find(prompt, 'task')
+        if entry:
+            choice = ask_reuse(self, entry, score)
+            if choice == 'reuse':
+                self.complete_output_display.setPlainText(f"Reused approved code from a {score:.0%} similar prompt:\n\n{entry['prompt']}")
+                self.complete_simple_task(prompt, [CodeBlock('python', entry['code'])])
+                return
+            if choice == 'seed':
+                prompt = seed_prompt(prompt, entry['code'])
+
+        if self.single_request_checkbox.isChecked():
+            if self.handleStructuredSubmit(prompt):
+                return
+            self.status_label.setText('Single request response was unusable, falling back to analysis...')
+            QApplication.processEvents()
+
         analysis_prompt = f"""Analyze the following prompt and determine if it's a simple task that can be completed directly, or a more complex task that should be broken down into subtasks.
 
 If it's a simple task (e.g., write a Python program to print the Fibonacci sequence), begin with "SIMPLE:", then complete the task and generate the code.
@@ -379,76 +731,163 @@ When creating the subtask prompts, the following is vital:
                 analysis = analysis_result[start_index:]
 
                 subtasks = self.split_tasks(analysis)
+                self.open_subtask_windows(prompt, analysis, subtasks)
+            else:
+                # Simple task, proceed with normal generation
+                self.complete_simple_task(prompt, extract_blocks(response.text))
 
-                main_task_filename = f"main_task_{int(time.time())}.py"
-                self.pm.current_file_path = os.path.join(self.pm.project_dir, main_task_filename)
-
-                self.progress_bar.setMaximum(len(subtasks))
-                self.progress_bar.setValue(0)
-                self.progress_bar.setVisible(True)
+        except Exception as e:
+            print(traceback.print_exc())
+            QMessageBox.critical(self, 'Error', f'An error occurred while analyzing complexity: {str(e)}')
+        finally:
+            self.progress_bar.setVisible(False)
+            self.status_label.setText('')
 
-                for i, sub in enumerate(subtasks, start=1):
-                    subtask_prompt = f"This is subtask {i} of {len(subtasks)} for the following overall task: ---\n\n{prompt}\n\nThe subtasks for this task are:\n{analysis}\n\nKeep the other subtasks in mind when writing the code for this subtask, but only complete subtask #{i}\n"
-                    subtask_window = SubtaskWindow(subtask_prompt, self.pm, self, main_task_filename, i, len(subtasks))
-                    subtask_window.move(20*i, 20*i)  # Offset each window
-                    subtask_window.show()
-                    self.subtask_windows.append(subtask_window)
+    def handleStructuredSubmit(self, prompt):
+        # One request returns every subtask prompt with its code. Subtasks that come back
+        # without usable code are generated on their own, the rest go straight to their windows.
+        self.status_label.setText('Generating subtasks and code in a single request...')
+        QApplication.processEvents()
+        try:
+            response = self.model.generate_content(STRUCTURED_PROMPT.format(prompt=prompt),
+                                                   generation_config={'response_mime_type': 'application/json'})
+            self.complete_output_display.setPlainText(response.text)
+            result = parse_structured_response(response.text)
+        except StructuredResponseError as e:
+            print(f"handleStructuredSubmit: {e}")
+            return False
+        except Exception as e:
+            print(traceback.print_exc())
+            QMessageBox.critical(self, 'Error', f'An error occurred during single request generation: {str(e)}')
+            return True
 
-                self.status_label.setText(f'Task broken down into {len(subtasks)} subtasks.')
+        try:
+            if result.kind == 'simple':
+                self.complete_simple_task(prompt, [CodeBlock('python', result.code)])
             else:
-                # Simple task, proceed with normal generation
-                self.progress_bar.setVisible(True)
-                self.progress_bar.setValue(0)
-                self.status_label.setText('Generating code...')
-                QApplication.processEvents()
-
-                try:
-                    generated_code = extract_code(response.text)
-                    self.progress_bar.setValue(30)
-                    QApplication.processEvents()
+                subtasks = [subtask.prompt for subtask in result.subtasks]
+                analysis = '\n'.join(f"{i}. {sub}" for i, sub in enumerate(subtasks, start=1))
+                self.open_subtask_windows(prompt, analysis, subtasks, [subtask.code for subtask in result.subtasks])
+        except Exception as e:
+            print(traceback.print_exc())
+            QMessageBox.critical(self, 'Error', f'An error occurred: {str(e)}')
+        finally:
+            self.progress_bar.setVisible(False)
+            self.status_label.setText('')
+        return True
 
-                    self.status_label.setText('Creating virtual environment...')
-                    venv_path = self.create_venv()
-                    self.progress_bar.setValue(50)
+    def open_subtask_windows(self, prompt, analysis, subtasks, codes=None):
+        if not self.start_task():
+            return
+        self.total_subtasks = len(subtasks)
+        main_task_filename = f"main_task_{int(time.time())}.py"
+        main_task_path = os.path.join(self.pm.project_dir, main_task_filename)
+
+        main_task = {
+            'prompt': prompt,
+            'code': '',
+            'output': '',
+            'status': 'in_progress',
+            'filename': main_task_filename
+        }
+        main_node = TaskNode(main_task, parent=self.current_node)
+        self.current_node.add_child(main_node)
+        self.current_node = main_node
+        self.current_main_node = main_node
+        self.pm.index.register_origin(main_task_path, main_node)
+        self.index_task(main_node)
+
+        self.progress_bar.setMaximum(len(subtasks))
+        self.progress_bar.setValue(0)
+        self.progress_bar.setVisible(True)
+
+        for i, sub in enumerate(subtasks, start=1):
+            subtask_prompt = f"This is subtask {i} of {len(subtasks)} for the following overall task: ---\n\n{prompt}\n\nThe subtasks for this task are:\n{analysis}\n\nKeep the other subtasks in mind when writing the code for this subtask, but only complete subtask #{i}\n"
+            subtask_filename = f"{os.path.splitext(main_task_filename)[0]}-{i}.py"
+            subtask_task = {
+                'prompt': subtask_prompt,
+                'subtask': sub,
+                'code': '',
+                'output': '',
+                'status': 'in_progress',
+                'filename': subtask_filename
+            }
+            subtask_node = TaskNode(subtask_task, parent=main_node)
+            main_node.add_child(subtask_node)
+            self.pm.index.register_origin(os.path.join(self.pm.project_dir, subtask_filename), subtask_node)
+            self.index_task(subtask_node)
+
+            subtask_window = SubtaskWindow(subtask_prompt, self.pm, self, main_task_filename, i, len(subtasks), subtask_node)
+            subtask_window.move(20*i, 20*i)  # Offset each window
+            subtask_window.show()
+            self.add_subtask_window(subtask_window)
+
+            if codes is not None:
+                if codes[i - 1]:
+                    subtask_window.set_generated_code(codes[i - 1], notify=False)
+                else:
+                    subtask_window.output_display.append('Code was missing from the combined response, generating this subtask separately...')
                     QApplication.processEvents()
+                    subtask_window.submit_subtask(subtask_prompt)
 
-                    self.status_label.setText('Installing libraries...')
-                    libraries = self.parse_libraries(generated_code)
-                    self.install_libraries(venv_path, libraries)
-                    self.progress_bar.setValue(70)
-                    QApplication.processEvents()
+        self.status_label.setText(f'Task broken down into {len(subtasks)} subtasks.')
 
-                    self.generated_code_display.setText(generated_code)
-                    self.status_label.setText('Code generation completed.')
-                    QApplication.processEvents()
+    def complete_simple_task(self, prompt, blocks):
+        self.progress_bar.setVisible(True)
+        self.progress_bar.setValue(0)
+        self.status_label.setText('Generating code...')
+        QApplication.processEvents()
 
-                    if self.pm.current_file_path:
-                        self.pm.write_to_file(self.pm.current_file_path, generated_code)
-
-                    task = {
-                        'prompt': prompt,
-                        'code': generated_code,
-                        'output': '',
-                        'status': 'in_progress'
-                    }
-                    task_node = TaskNode(task, parent=self.current_node)
-                    self.current_node.add_child(task_node)
-                    self.current_node = task_node
-
-                    filename = task_node.get_task_filename()
-                    self.pm.write_to_file(filename, generated_code)
-
-                    self.visualize_tasks()
-                except Exception as e:
-                    print(traceback.print_exc())
-                    QMessageBox.critical(self, 'Error', f'An error occurred: {str(e)}')
-                finally:
-                    self.progress_bar.setVisible(False)
-                    self.status_label.setText('')
+        try:
+            primary, extra_blocks = split_primary(blocks)
+            generated_code = primary.code if primary else ''
+            self.progress_bar.setValue(30)
+            QApplication.processEvents()
+
+            self.status_label.setText('Creating virtual environment...')
+            venv_path = self.create_venv()
+            self.progress_bar.setValue(50)
+            QApplication.processEvents()
+
+            self.status_label.setText('Installing libraries...')
+            libraries = self.parse_libraries('\n'.join([generated_code] + [b.code for b in extra_blocks if b.language == 'python']))
+            self.install_libraries(venv_path, libraries)
+            self.progress_bar.setValue(70)
+            QApplication.processEvents()
+
+            self.generated_code_display.setText(generated_code)
+            self.status_label.setText('Code generation completed.')
+            QApplication.processEvents()
+
+            # current_file_path is only set by opening or creating a file, so the code goes
+            # into the file the user is editing; otherwise every task gets a file of its own.
+            if self.pm.current_file_path:
+                filename = os.path.relpath(self.pm.current_file_path, self.pm.project_dir)
+            else:
+                filename = f"task_{int(time.time())}.py"
+
+            task = {
+                'prompt': prompt,
+                'code': generated_code,
+                'output': '',
+                'status': 'in_progress',
+                'filename': filename
+            }
+            task_node = TaskNode(task, parent=self.current_node)
+            self.current_node.add_child(task_node)
+            self.current_node = task_node
+            self.index_task(task_node)
+
+            file_path = os.path.join(self.pm.project_dir, filename)
+            self.pm.index.register_origin(file_path, task_node)
+            self.pm.write_to_file(generated_code, file_path)
+            for path in self.pm.write_code_blocks(extra_blocks, file_path, task_node):
+                self.output_display.append(f"Saved additional file: {os.path.relpath(path, self.pm.project_dir)}")
 
+            self.visualize_tasks()
         except Exception as e:
             print(traceback.print_exc())
-            QMessageBox.critical(self, 'Error', f'An error occurred while analyzing complexity: {str(e)}')
+            QMessageBox.critical(self, 'Error', f'An error occurred: {str(e)}')
         finally:
             self.progress_bar.setVisible(False)
             self.status_label.setText('')
@@ -478,16 +917,45 @@ When creating the subtask prompts, the following is vital:
     def handle_execute(self):
         filename = self.current_node.get_task_filename()
         file_path = os.path.join(self.pm.project_dir, filename)
+        if not flush_or_report(self, self.pm, file_path):
+            return
         if os.path.exists(file_path):
+            self.output_node = self.current_node
+            self.output_node.task['output'] = ''
             self.run_code(file_path)
         else:
             QMessageBox.warning(self, 'Warning', 'No file found. Please submit the task first.')
 
+    def handle_profile(self):
+        filename = self.current_node.get_task_filename()
+        file_path = os.path.join(self.pm.project_dir, filename)
+        if not flush_or_report(self, self.pm, file_path):
+            return
+        if os.path.exists(file_path):
+            profile_run = start_profile(self, self.pm.venv_python(), file_path, self.pm.project_dir, self.output_display)
+            self.resources.track_process(profile_run.process, self)
+        else:
+            QMessageBox.warning(self, 'Warning', 'No file found. Please submit the task first.')
+
+    def handle_benchmark(self):
+        filename = self.current_node.get_task_filename()
+        file_path = os.path.join(self.pm.project_dir, filename)
+        if not flush_or_report(self, self.pm, file_path):
+            return
+        if os.path.exists(file_path):
+            benchmark_run = start_benchmark(self, self.pm.venv_python(), file_path, self.output_display, self.current_node,
+                                            self.visualize_tasks)
+            if benchmark_run:
+                self.resources.track_process(benchmark_run.process, self)
+        else:
+            QMessageBox.warning(self, 'Warning', 'No file found. Please submit the task first.')
+
     def handleApprove(self):
         if self.current_node.task['status'] == 'complete':
             QMessageBox.information(self, 'Success', 'Task already completed.')
         else:
             self.current_node.task['status'] = 'complete'
+            self.similarity_index.add(unseeded_prompt(self.current_node.task['prompt']), self.current_node.task.get('code', ''), 'task')
             self.visualize_tasks()
             QMessageBox.information(self, 'Success', 'Task approved and marked as complete.')
 
@@ -499,14 +967,80 @@ When creating the subtask prompts, the following is vital:
         prompt = f"Please refactor the following code:\n\n{self.current_node.task['code']}"
         try:
             response = self.model.generate_content(prompt)
-            refactored_code = response.text.strip()
+            refactored_code = extract_code(response.text) or response.text.strip()
             self.current_node.task['code'] = refactored_code
+            self.index_task(self.current_node)
+            self.generated_code_display.setText(refactored_code)
+            file_path = os.path.join(self.pm.project_dir, self.current_node.get_task_filename())
+            self.pm.write_to_file(refactored_code, file_path)
             self.visualize_tasks()
             QMessageBox.information(self, 'Success', 'Task refactored successfully.')
         except Exception as e:
             print(traceback.print_exc())
             QMessageBox.critical(self, 'Error', f'An error occurred while refactoring: {str(e)}')
 
+    def handlePerformanceRefactor(self):
+        # Generates several rewrites in parallel, keeps only those whose output matches the
+        # original's, and replaces the code with the fastest one if it beats the original.
+        # The event loop keeps running meanwhile, so the node is captured up front and the
+        # actions that could start another run or remove the node are disabled.
+        node = self.current_node
+        task = node.task
+        if task['status'] == 'complete':
+            QMessageBox.warning(self, 'Warning', 'Cannot refactor a completed task.')
+            return
+        if not task.get('code', '').strip():
+            QMessageBox.warning(self, 'Warning', 'No code to refactor. Please submit the task first.')
+            return
+        file_path = os.path.join(self.pm.project_dir, node.get_task_filename())
+
+        actions = [self.submit_button, self.approve_button, self.refactor_button, self.perf_refactor_button,
+                   self.breakdown_button, self.delete_button, self.execute_button, self.profile_button,
+                   self.benchmark_button]
+        enabled = [action.isEnabled() for action in actions]
+        for action in actions:
+            action.setEnabled(False)
+        self.progress_bar.setMaximum(0)
+        self.progress_bar.setVisible(True)
+        messages = []
+        try:
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                future = executor.submit(performance_refactor, self.model, task['code'], self.pm.venv_python(),
+                                         self.pm.project_dir, CANDIDATES, messages.append)
+                while not future.done():
+                    if messages:
+                        self.status_label.setText(messages[-1])
+                    QApplication.processEvents()
+                    time.sleep(0.05)
+                result = future.result()
+
+            task['output'] = result.baseline.output
+            self.index_task(node)
+            self.output_display.append(format_refactor_report(result))
+            if result.best:
+                task['code'] = result.best.code
+                task['speedup'] = result.speedup
+                self.index_task(node)
+                if self.current_node is node:
+                    self.generated_code_display.setText(result.best.code)
+                self.pm.write_to_file(result.best.code, file_path)
+                self.visualize_tasks()
+                QMessageBox.information(self, 'Success', f'Code refactored: {result.speedup:.2f}x faster with identical output.')
+            else:
+                QMessageBox.information(self, 'Refactor', f'No candidate was both equivalent and at least {MIN_SPEEDUP:.2f}x faster. The code is unchanged.')
+        except RefactorRefused as e:
+            self.output_display.append(f'Performance refactor skipped: {e}.')
+            QMessageBox.information(self, 'Refactor', f'Not refactored: {e}.')
+        except Exception as e:
+            print(traceback.print_exc())
+            QMessageBox.critical(self, 'Error', f'An error occurred while refactoring for performance: {str(e)}')
+        finally:
+            for action, was_enabled in zip(actions, enabled):
+                action.setEnabled(was_enabled)
+            self.progress_bar.setMaximum(100)
+            self.progress_bar.setVisible(False)
+            self.status_label.setText('')
+
     def handleBreakdown(self):
         if self.current_node.task['status'] == 'complete':
             QMessageBox.warning(self, 'Warning', 'Cannot break down a completed task.')
@@ -517,9 +1051,10 @@ When creating the subtask prompts, the following is vital:
             response = self.model.generate_content(prompt)
             subtasks = response.text.strip().split('\n')
             for subtask in subtasks:
-                subtask_window = SubtaskWindow(subtask, self.pm, self, self.pm.current_file_path, len(self.subtask_windows) + 1, len(subtasks))
+                self.total_subtasks += 1
+                subtask_window = SubtaskWindow(subtask, self.pm, self, self.current_node.get_task_filename(), self.total_subtasks, len(subtasks))
                 subtask_window.show()
-                self.subtask_windows.append(subtask_window)
+                self.add_subtask_window(subtask_window)
         except Exception as e:
             print(traceback.print_exc())
             QMessageBox.critical(self, 'Error', f'An error occurred while breaking down the task: {str(e)}')
@@ -530,15 +1065,22 @@ When creating the subtask prompts, the following is vital:
         else:
             parent_node = self.current_node.parent
             parent_node.children.remove(self.current_node)
+            self.search_index.remove_task(self.current_node)
+            self.update_search_results()
             self.current_node = parent_node
             self.visualize_tasks()
             QMessageBox.information(self, 'Success', 'Task deleted.')
     
     def generate_summary(self, task):
-        prompt = f"Please provide a brief one-sentence summary of the following task:\n\n{task['prompt']}"
+        # Every redraw of the tree asks for each node's summary; the prompt doesn't change,
+        # so the model is only asked once per task.
+        if task.get('summary'):
+            return task['summary']
+        prompt = f"Please provide a brief one-sentence summary of the following task:\n\n{task.get('subtask') or task['prompt']}"
         try:
             response = self.model.generate_content(prompt)
             print(f"generate_summary response: {response}")
+            task['summary'] = response.text
             return response.text
         except Exception as e:
             print(traceback.print_exc())
@@ -566,8 +1108,7 @@ When creating the subtask prompts, the following is vital:
     def run_code(self, file_path):
         try:
             if file_path:
-                venv_dir = os.path.join(self.pm.project_dir, 'venv')
-                venv_python = os.path.join(venv_dir, 'Scripts', 'python') if sys.platform == 'win32' else os.path.join(venv_dir, 'bin', 'python')
+                venv_python = self.pm.venv_python()
 
                 self.process = QProcess(self)
                 self.process.setProcessChannelMode(QProcess.MergedChannels)
@@ -578,7 +1119,7 @@ When creating the subtask prompts, the following is vital:
                 env.insert("PYTHONUNBUFFERED", "1")
                 self.process.setProcessEnvironment(env)
 
-                self.process.start(venv_python, [file_path])
+                self.resources.start_process(self, self.process, venv_python, [file_path])
             else:
                 QMessageBox.warning(self, 'Warning', 'No file opened. Please open a file first.')
         except Exception as e:
@@ -601,9 +1142,14 @@ When creating the subtask prompts, the following is vital:
     def handle_stdout(self):
         data = self.process.readAllStandardOutput().data().decode()
         self.output_display.append(data)
+        if self.output_node:
+            self.output_node.task['output'] += data
 
     def process_finished(self):
         self.output_display.append("Process finished.")
+        if self.output_node:
+            self.index_task(self.output_node)
+            self.output_node = None
 
     def send_input(self):
         try:
@@ -623,17 +1169,40 @@ When creating the subtask prompts, the following is vital:
                 include_button.clicked.connect(lambda checked, n=subtask_number, w=window: w.include_subtask(n))
                 window.include_buttons_layout.addWidget(include_button)
 
-        if len(self.approved_subtasks) == len(self.subtask_windows):
+        if len(self.approved_subtasks) == self.total_subtasks:
             self.all_subtasks_completed()
         
     def all_subtasks_completed(self):
-        QMessageBox.information(self, 'Success', 'All subtasks have been completed and approved!')
-        # Combine all subtasks into the final result, maybe?
+        # Final assembly: this is the only place the approved subtasks' full code is inlined.
+        main_node = self.current_main_node
+        if main_node is None:
+            QMessageBox.information(self, 'Success', 'All subtasks have been completed and approved!')
+            return
+        main_filename = os.path.splitext(main_node.get_task_filename())[0]
+        if not flush_or_report(self, self.pm):
+            return
+        modules = []
+        for number in sorted(self.approved_subtasks):
+            subtask_path = os.path.join(self.pm.project_dir, f"{main_filename}-{number}.py")
+            if os.path.exists(subtask_path):
+                with open(subtask_path, 'r') as f:
+                    modules.append((f"Subtask #{number}", f.read()))
+        assembled = assemble_modules(modules)
+        main_node.task['code'] = assembled
+        self.index_task(main_node)
+        main_path = os.path.join(self.pm.project_dir, main_node.get_task_filename())
+        self.pm.write_to_file(assembled, main_path)
+        self.current_node = main_node
+        self.generated_code_display.setText(assembled)
+        if not flush_or_report(self, self.pm, main_path):
+            return
+        QMessageBox.information(self, 'Success', f'All subtasks have been completed and approved! They were combined into {main_node.get_task_filename()}.')
 
 
 class NewProjectTab(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
+        self.resources = parent.resources
         layout = QVBoxLayout()
 
         self.code_input = QTextEdit()
@@ -660,6 +1229,10 @@ class NewProjectTab(QWidget):
 
         self.run_button.setEnabled(False)  # Initially disabled
 
+        self.profile_button = QPushButton('Profile')
+        self.profile_button.clicked.connect(self.profile_code)
+        self.profile_button.setEnabled(False)
+
         self.create_project_button = QPushButton('Create New Project')
         self.create_project_button.clicked.connect(self.create_new_project)
 
@@ -684,7 +1257,10 @@ class NewProjectTab(QWidget):
 
         code_input_layout = QVBoxLayout()
         code_input_layout.addWidget(self.code_input)
-        code_input_layout.addWidget(self.run_button)
+        run_buttons_layout = QHBoxLayout()
+        run_buttons_layout.addWidget(self.run_button)
+        run_buttons_layout.addWidget(self.profile_button)
+        code_input_layout.addLayout(run_buttons_layout)
 
         layout.addWidget(self.current_project_label)
         layout.addLayout(project_buttons_layout)
@@ -700,15 +1276,20 @@ class NewProjectTab(QWidget):
         self.setLayout(layout)
 
         self.pm = ProjectManager()
+        connect_write_failures(self, self.pm)
 
     def update_run_button_state(self):
         code = self.code_input.toPlainText().strip()
         self.run_button.setEnabled(bool(code))
+        self.profile_button.setEnabled(bool(code))
 
     def send_input(self):
-        input_text = self.input_line_edit.text()
-        self.process.write(f"{input_text}\n".encode())
-        self.input_line_edit.clear()
+        try:
+            input_text = self.input_line_edit.text()
+            self.process.write(f"{input_text}\n".encode())
+            self.input_line_edit.clear()
+        except Exception as e:
+            QMessageBox.information(self, 'Error', f'Exception in send_input: {e}')
 
     def create_new_project(self):
         self.pm.create_new_project()
@@ -725,21 +1306,22 @@ class NewProjectTab(QWidget):
     def create_new_file(self):
         self.pm.create_new_file()
         self.run_button.setEnabled(True)
+        self.profile_button.setEnabled(True)
 
     def open_file(self):
         file_content = self.pm.open_file()
         if file_content:
             self.code_input.setPlainText(file_content)
             self.run_button.setEnabled(True)
+            self.profile_button.setEnabled(True)
 
     def run_code(self):
         if self.pm.current_file_path:
-            with open(self.pm.current_file_path, 'w') as file:
-                file.write(self.code_input.toPlainText())
-            print(f"Updated file: {self.pm.current_file_path}")
+            self.pm.write_to_file(self.code_input.toPlainText())
+            if not flush_or_report(self, self.pm, self.pm.current_file_path):
+                return
 
-            venv_dir = os.path.join(self.pm.project_dir, 'venv')
-            venv_python = os.path.join(venv_dir, 'Scripts', 'python') if sys.platform == 'win32' else os.path.join(venv_dir, 'bin', 'python')
+            venv_python = self.pm.venv_python()
 
             self.process = QProcess(self)
             self.process.setProcessChannelMode(QProcess.MergedChannels)
@@ -750,7 +1332,17 @@ class NewProjectTab(QWidget):
             env.insert("PYTHONUNBUFFERED", "1")
             self.process.setProcessEnvironment(env)
 
-            self.process.start(venv_python, [self.pm.current_file_path])
+            self.resources.start_process(self, self.process, venv_python, [self.pm.current_file_path])
+        else:
+            QMessageBox.warning(self, 'Warning', 'No file opened. Please open a file first.')
+
+    def profile_code(self):
+        if self.pm.current_file_path:
+            self.pm.write_to_file(self.code_input.toPlainText())
+            if not flush_or_report(self, self.pm, self.pm.current_file_path):
+                return
+            profile_run = start_profile(self, self.pm.venv_python(), self.pm.current_file_path, self.pm.project_dir, self.output_text_edit)
+            self.resources.track_process(profile_run.process, self)
         else:
             QMessageBox.warning(self, 'Warning', 'No file opened. Please open a file first.')
 
@@ -798,8 +1390,13 @@ class TaskTreeView(QGraphicsView):
         bubble.setBrush(QBrush(color))
         self.scene.addItem(bubble)
 
-        summary = code_gen_app.generate_summary(task_node.task)
-        text = QGraphicsTextItem(summary[:50])
+        summary = code_gen_app.generate_summary(task_node.task)[:50]
+        if task_node.task.get('benchmarks') and task_node.task['benchmarks'][-1]['results']:
+            benchmark = task_node.task['benchmarks'][-1]
+            summary += f"\n{benchmark['complexity']}, {format_seconds(benchmark['results'][-1]['median'])} at n={benchmark['results'][-1]['size']}"
+        if task_node.task.get('speedup'):
+            summary += f"\nRefactored: {task_node.task['speedup']:.2f}x faster"
+        text = QGraphicsTextItem(summary)
         text.setPos(x + 10, y + 30)
         self.scene.addItem(text)
 
@@ -0,0 +1,178 @@
+# perfrefactor.py
+import os
+import time
+import shutil
+import tempfile
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from codeblocks import extract_blocks, split_primary
+
+CANDIDATES = 3
+TIMING_REPEATS = 3
+RUN_TIMEOUT = 60
+# Best-of-N timings still wobble by a few percent; a candidate has to beat the original
+# by more than that before it is allowed to replace the user's code.
+MIN_SPEEDUP = 1.10
+
+PERFORMANCE_PROMPT = """Rewrite the following Python program so it runs faster.
+
+Requirements:
+- The program must produce exactly the same output for the same input.
+- Keep every function and class that other code might import, with the same names and signatures.
+- {focus}
+- Return the complete program in a single ```python code block and nothing else.
+
+```python
+{code}
+```"""
+
+# Each candidate gets a different angle so the K rewrites don't all converge on the same change.
+FOCUS_HINTS = [
+    'Look for algorithmic improvements first (better complexity, avoiding repeated work).',
+    'Focus on data structures: sets and dicts for lookups, avoiding quadratic list operations.',
+    'Focus on reducing interpreter overhead: builtins, comprehensions, local variables, fewer function calls in hot loops.',
+    'Focus on I/O and string handling: batch output, avoid repeated concatenation.',
+]
+
+class RefactorRefused(ValueError):
+    # The original program gives nothing to check candidates against.
+    pass
+
+class Measurement:
+    def __init__(self, output, returncode, seconds, stable=True):
+        self.output = output
+        self.returncode = returncode
+        self.seconds = seconds
+        self.stable = stable  # every repeat printed the same output
+
+class Candidate:
+    def __init__(self, number, code):
+        self.number = number
+        self.code = code
+        self.measurement = None
+        self.error = None
+
+    @property
+    def correct(self):
+        return self.error is None
+
+class RefactorResult:
+    def __init__(self, baseline, candidates, best):
+        self.baseline = baseline
+        self.candidates = candidates
+        self.best = best
+
+    @property
+    def speedup(self):
+        if self.best is None:
+            return None
+        return self.baseline.seconds / max(self.best.measurement.seconds, 1e-9)
+
+def normalize_output(output):
+    return '\n'.join(line.rstrip() for line in output.strip().splitlines())
+
+def measure(python, file_path, project_dir, repeats=TIMING_REPEATS, timeout=RUN_TIMEOUT):
+    # Runs the script with stdin closed; the best wall time of `repeats` runs is kept.
+    env = dict(os.environ, PYTHONUNBUFFERED='1', PYTHONPATH=project_dir)
+    best, result, outputs = None, None, set()
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = subprocess.run([python, file_path], cwd=project_dir, env=env, stdin=subprocess.DEVNULL,
+                                stdout=subprocess.PIPE, stderr=subprocess.STDOUT, timeout=timeout)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+        outputs.add(result.stdout)
+    return Measurement(result.stdout.decode(errors='replace'), result.returncode, best, len(outputs) == 1)
+
+def check_baseline(baseline):
+    # Candidates are only checked by comparing output, so the original must print something,
+    # succeed with stdin closed, and print the same thing every time.
+    if baseline.returncode != 0:
+        raise RefactorRefused(f'the original exits with code {baseline.returncode} when run without input, '
+                              'so its output can\'t be used to check rewrites')
+    if not normalize_output(baseline.output):
+        raise RefactorRefused('the original prints nothing when run, so there is no output to check rewrites against')
+    if not baseline.stable:
+        raise RefactorRefused('the original prints different output on each run (randomness or timing), '
+                              'so rewrites can\'t be checked against it')
+
+def startup_time(python):
+    started = time.perf_counter()
+    subprocess.run([python, '-c', 'pass'], stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - started
+
+def generate_candidates(model, code, k=CANDIDATES):
+    def generate(i):
+        prompt = PERFORMANCE_PROMPT.format(code=code, focus=FOCUS_HINTS[i % len(FOCUS_HINTS)])
+        response = model.generate_content(prompt)
+        primary, _ = split_primary(extract_blocks(response.text))
+        return Candidate(i + 1, primary.code if primary else '')
+
+    with ThreadPoolExecutor(max_workers=k) as executor:
+        return list(executor.map(generate, range(k)))
+
+def performance_refactor(model, code, python, project_dir, k=CANDIDATES, progress=None):
+    progress = progress or (lambda message: None)
+    work_dir = tempfile.mkdtemp(prefix='refactor_')
+    try:
+        original_path = os.path.join(work_dir, 'original.py')
+        with open(original_path, 'w') as file:
+            file.write(code)
+
+        # Cheap check before spending model calls on a program that can't be verified.
+        progress('Checking that the original produces verifiable output...')
+        check_baseline(measure(python, original_path, project_dir, repeats=2))
+
+        progress(f'Generating {k} candidate rewrites...')
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            # Candidates are generated while the original is being timed.
+            candidates_future = executor.submit(generate_candidates, model, code, k)
+            progress('Recording the original output and timing...')
+            overhead = min(startup_time(python) for _ in range(3))
+            baseline = measure(python, original_path, project_dir)
+            candidates = candidates_future.result()
+        check_baseline(baseline)
+        baseline.seconds = max(baseline.seconds - overhead, 1e-9)
+        expected = normalize_output(baseline.output)
+
+        for candidate in candidates:
+            progress(f'Checking candidate {candidate.number} of {k}...')
+            if not candidate.code.strip():
+                candidate.error = 'no code in response'
+                continue
+            if candidate.code.strip() == code.strip():
+                candidate.error = 'identical to the original'
+                continue
+            path = os.path.join(work_dir, f'candidate_{candidate.number}.py')
+            with open(path, 'w') as file:
+                file.write(candidate.code)
+            try:
+                candidate.measurement = measure(python, path, project_dir)
+            except subprocess.TimeoutExpired:
+                candidate.error = f'timed out after {RUN_TIMEOUT}s'
+                continue
+            candidate.measurement.seconds = max(candidate.measurement.seconds - overhead, 1e-9)
+            if candidate.measurement.returncode != baseline.returncode:
+                candidate.error = f'exit code {candidate.measurement.returncode}, expected {baseline.returncode}'
+            elif normalize_output(candidate.measurement.output) != expected:
+                candidate.error = 'output differs from the original'
+
+        correct = [c for c in candidates if c.correct and c.measurement.seconds * MIN_SPEEDUP <= baseline.seconds]
+        best = min(correct, key=lambda c: c.measurement.seconds) if correct else None
+        return RefactorResult(baseline, candidates, best)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+def format_refactor_report(result):
+    lines = [f"Original: {result.baseline.seconds:.4f}s"]
+    for c in result.candidates:
+        if c.correct:
+            lines.append(f"Candidate {c.number}: {c.measurement.seconds:.4f}s "
+                         f"({result.baseline.seconds / max(c.measurement.seconds, 1e-9):.2f}x)")
+        else:
+            lines.append(f"Candidate {c.number}: rejected, {c.error}")
+    if result.best:
+        lines.append(f"Kept candidate {result.best.number}: {result.speedup:.2f}x faster")
+    else:
+        lines.append(f'No candidate was both equivalent and at least {MIN_SPEEDUP:.2f}x faster; the code is unchanged.')
+    return '\n'.join(lines)
@@ -0,0 +1,207 @@
+# profiler.py
+import os
+import json
+import tempfile
+from PyQt5.QtWidgets import QDialog, QVBoxLayout, QLabel, QTabWidget, QTableWidget, QTableWidgetItem, QHeaderView
+from PyQt5.QtCore import Qt, QObject, QProcess, QProcessEnvironment, pyqtSignal
+
+TOP_ENTRIES = 50
+
+# Runs inside the project's venv interpreter. The script runs twice: once under cProfile
+# alone for the .prof file and the timing table, then under tracemalloc alone for peak
+# memory and allocation sites, since tracemalloc's allocation hook would distort the
+# timings. The second run's output is discarded so the user sees the program's output once.
+PROFILE_RUNNER = r'''
+import contextlib, cProfile, io, json, pstats, runpy, sys, traceback, tracemalloc
+prof_path, summary_path, script, top = sys.argv[1], sys.argv[2], sys.argv[3], int(sys.argv[4])
+sys.argv = [script]
+sys.path.insert(0, __import__('os').path.dirname(script))
+
+def run_script():
+    try:
+        runpy.run_path(script, run_name='__main__')
+    except SystemExit:
+        pass
+    except BaseException as e:
+        traceback.print_exc()
+        return repr(e)
+    return None
+
+profiler = cProfile.Profile()
+profiler.enable()
+try:
+    error = run_script()
+finally:
+    profiler.disable()
+profiler.dump_stats(prof_path)
+
+functions = []
+for (filename, line, name), (cc, nc, tt, ct, callers) in pstats.Stats(profiler).stats.items():
+    if 'runpy' in filename or filename == '<string>' or name == "<method 'disable' of '_lsprof.Profiler' objects>":
+        continue
+    functions.append({'function': name, 'file': filename, 'line': line, 'calls': nc,
+                      'tottime': tt, 'cumtime': ct})
+functions.sort(key=lambda f: f['cumtime'], reverse=True)
+
+print('Measuring memory in a second run (output hidden)...', flush=True)
+sink = io.StringIO()
+tracemalloc.start()
+try:
+    with contextlib.redirect_stdout(sink), contextlib.redirect_stderr(sink):
+        run_script()
+finally:
+    snapshot = tracemalloc.take_snapshot()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+snapshot = snapshot.filter_traces([
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, '<frozen *>'),
+    tracemalloc.Filter(False, '<string>'),
+    tracemalloc.Filter(False, '*runpy.py'),
+    tracemalloc.Filter(False, '*pkgutil.py'),
+    tracemalloc.Filter(False, contextlib.__file__),
+])
+allocations = [{'file': stat.traceback[0].filename, 'line': stat.traceback[0].lineno,
+                'size': stat.size, 'count': stat.count}
+               for stat in snapshot.statistics('lineno')[:top]]
+
+with open(summary_path, 'w') as file:
+    json.dump({'prof_path': prof_path, 'peak': peak, 'current': current, 'error': error,
+               'functions': functions[:top], 'allocations': allocations}, file)
+'''
+
+def format_size(size):
+    for unit in ('B', 'KiB', 'MiB'):
+        if abs(size) < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
+def format_profile_summary(result, top=5):
+    lines = [f"Profile saved to {result['prof_path']}",
+             f"Peak traced memory: {format_size(result['peak'])}"]
+    if result['error']:
+        lines.append(f"Script raised: {result['error']}")
+    lines.append('Top functions by cumulative time:')
+    for f in result['functions'][:top]:
+        lines.append(f"  {f['cumtime']:.4f}s  {f['calls']:>8} calls  {f['function']} ({os.path.basename(f['file'])}:{f['line']})")
+    lines.append('Top allocation sites:')
+    for a in result['allocations'][:top]:
+        lines.append(f"  {format_size(a['size']):>12}  {a['count']:>8} blocks  {os.path.basename(a['file'])}:{a['line']}")
+    return '\n'.join(lines)
+
+class ProfileRun(QObject):
+    output = pyqtSignal(str)
+    completed = pyqtSignal(dict)
+    failed = pyqtSignal(str)
+
+    def __init__(self, venv_python, file_path, project_dir, parent=None):
+        super().__init__(parent)
+        self.venv_python = venv_python
+        self.file_path = file_path
+        self.prof_path = os.path.join(project_dir, os.path.splitext(os.path.basename(file_path))[0] + '.prof')
+        fd, self.summary_path = tempfile.mkstemp(prefix='profile_', suffix='.json')
+        os.close(fd)
+
+        self.process = QProcess(self)
+        self.process.setProcessChannelMode(QProcess.MergedChannels)
+        self.process.setWorkingDirectory(project_dir)
+        self.process.readyReadStandardOutput.connect(self.handle_stdout)
+        self.process.finished.connect(self.process_finished)
+
+        env = QProcessEnvironment.systemEnvironment()
+        env.insert("PYTHONUNBUFFERED", "1")
+        self.process.setProcessEnvironment(env)
+
+    def start(self):
+        self.process.start(self.venv_python, ['-c', PROFILE_RUNNER, self.prof_path, self.summary_path,
+                                              self.file_path, str(TOP_ENTRIES)])
+
+    def handle_stdout(self):
+        self.output.emit(self.process.readAllStandardOutput().data().decode(errors='replace'))
+
+    def process_finished(self):
+        try:
+            with open(self.summary_path, 'r') as file:
+                result = json.load(file)
+        except (OSError, ValueError):
+            self.failed.emit(f'Profiling did not produce results (exit code {self.process.exitCode()}).')
+            return
+        finally:
+            self.deleteLater()
+            if os.path.exists(self.summary_path):
+                os.remove(self.summary_path)
+        self.completed.emit(result)
+
+class NumericItem(QTableWidgetItem):
+    def __init__(self, value, text=None):
+        super().__init__(text if text is not None else str(value))
+        self.setData(Qt.UserRole, value)
+        self.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+
+    def __lt__(self, other):
+        return self.data(Qt.UserRole) < other.data(Qt.UserRole)
+
+class ProfileResultsDialog(QDialog):
+    def __init__(self, result, title, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(f"Profile: {title}")
+        layout = QVBoxLayout()
+
+        summary = f"Peak traced memory: {format_size(result['peak'])}    Raw profile: {result['prof_path']}"
+        if result['error']:
+            summary += f"\nScript raised: {result['error']}"
+        layout.addWidget(QLabel(summary))
+
+        tabs = QTabWidget()
+        functions_table = self.create_table(['Function', 'Location', 'Calls', 'Total Time (s)', 'Cumulative Time (s)'], len(result['functions']))
+        for row, f in enumerate(result['functions']):
+            functions_table.setItem(row, 0, QTableWidgetItem(f['function']))
+            functions_table.setItem(row, 1, QTableWidgetItem(f"{f['file']}:{f['line']}"))
+            functions_table.setItem(row, 2, NumericItem(f['calls']))
+            functions_table.setItem(row, 3, NumericItem(f['tottime'], f"{f['tottime']:.6f}"))
+            functions_table.setItem(row, 4, NumericItem(f['cumtime'], f"{f['cumtime']:.6f}"))
+        self.finish_table(functions_table, 4)
+        tabs.addTab(functions_table, 'Functions')
+
+        allocations_table = self.create_table(['Location', 'Size', 'Blocks'], len(result['allocations']))
+        for row, a in enumerate(result['allocations']):
+            allocations_table.setItem(row, 0, QTableWidgetItem(f"{a['file']}:{a['line']}"))
+            allocations_table.setItem(row, 1, NumericItem(a['size'], format_size(a['size'])))
+            allocations_table.setItem(row, 2, NumericItem(a['count']))
+        self.finish_table(allocations_table, 1)
+        tabs.addTab(allocations_table, 'Allocations')
+
+        layout.addWidget(tabs)
+        self.setLayout(layout)
+        self.resize(1000, 600)
+
+    def create_table(self, headers, row_count):
+        table = QTableWidget(row_count, len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.setEditTriggers(QTableWidget.NoEditTriggers)
+        table.setSelectionBehavior(QTableWidget.SelectRows)
+        table.verticalHeader().setVisible(False)
+        return table
+
+    def finish_table(self, table, sort_column):
+        table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        table.setSortingEnabled(True)
+        table.sortByColumn(sort_column, Qt.DescendingOrder)
+
+def start_profile(parent, venv_python, file_path, project_dir, output_display):
+    # Shared by every window with a Profile button: stream output into the window's
+    # output panel, then append the summary and open the sortable results table.
+    def show_results(result):
+        output_display.append(format_profile_summary(result))
+        parent.profile_dialog = ProfileResultsDialog(result, os.path.basename(file_path), parent)
+        parent.profile_dialog.show()
+
+    output_display.append(f"Profiling {os.path.basename(file_path)}...")
+    run = ProfileRun(venv_python, file_path, project_dir, parent)
+    run.output.connect(output_display.append)
+    run.failed.connect(output_display.append)
+    run.completed.connect(show_results)
+    run.start()
+    return run
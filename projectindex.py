@@ -0,0 +1,168 @@
+# projectindex.py
+import os
+import hashlib
+from PyQt5.QtCore import QObject, QFileSystemWatcher, pyqtSignal
+
+IGNORED_DIRS = {'venv', '.venv', '__pycache__', '.git'}
+
+def hash_file(path):
+    sha = hashlib.sha1()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(65536), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+class FileEntry:
+    def __init__(self, path, size, mtime, content_hash):
+        self.path = path
+        self.size = size
+        self.mtime = mtime
+        self.content_hash = content_hash
+
+class ProjectIndex(QObject):
+    file_added = pyqtSignal(str)
+    file_changed = pyqtSignal(str)
+    file_removed = pyqtSignal(str)
+    project_opened = pyqtSignal(str)
+    refresh_requested = pyqtSignal(str)
+    write_failed = pyqtSignal(str, str)  # path, error; emitted by the background writer
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.project_dir = None
+        self.files = {}      # absolute path -> FileEntry
+        self.by_name = {}    # file name -> set of absolute paths
+        self.origins = {}    # absolute path -> task or subtask the file was generated for
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self._directory_changed)
+        self.watcher.fileChanged.connect(self._file_changed)
+        # Lets the background writer ask for a refresh; the slot runs on the GUI thread.
+        self.refresh_requested.connect(self.refresh)
+
+    def open(self, project_dir):
+        self.close()
+        self.project_dir = os.path.abspath(project_dir)
+        for dirpath, dirnames, filenames in os.walk(self.project_dir):
+            dirnames[:] = [d for d in dirnames if d not in IGNORED_DIRS]
+            self.watcher.addPath(dirpath)
+            for filename in filenames:
+                self._update(os.path.join(dirpath, filename), emit=False)
+        print(f"Indexed {len(self.files)} files in {self.project_dir}")
+        self.project_opened.emit(self.project_dir)
+
+    def close(self):
+        watched = self.watcher.files() + self.watcher.directories()
+        if watched:
+            self.watcher.removePaths(watched)
+        self.project_dir = None
+        self.files.clear()
+        self.by_name.clear()
+        self.origins.clear()
+
+    def lookup(self, name):
+        # Accepts an absolute path, a path relative to the project or a bare file name.
+        if not self.project_dir:
+            return None
+        path = name if os.path.isabs(name) else os.path.join(self.project_dir, name)
+        path = os.path.normpath(path)
+        if path in self.files:
+            return self.files[path]
+        paths = self.by_name.get(os.path.basename(name))
+        if paths:
+            return self.files[min(paths)]
+        return None
+
+    def names(self):
+        return sorted(os.path.relpath(path, self.project_dir) for path in self.files)
+
+    def register_origin(self, path, origin):
+        path = os.path.normpath(os.path.abspath(path))
+        self.origins[path] = origin
+
+    def origin_of(self, path):
+        return self.origins.get(os.path.normpath(os.path.abspath(path)))
+
+    def files_for_origin(self, origin):
+        return [path for path, o in self.origins.items() if o is origin]
+
+    def refresh(self, path):
+        # Called after the app writes a file itself, so the index doesn't wait on the watcher.
+        self._update(os.path.normpath(os.path.abspath(path)))
+
+    def _in_project(self, path):
+        if not self.project_dir:
+            return False
+        rel = os.path.relpath(path, self.project_dir)
+        if rel.startswith(os.pardir):
+            return False
+        name = os.path.basename(rel)
+        if name.startswith('.') and name.endswith('.tmp'):
+            return False
+        return not any(part in IGNORED_DIRS for part in rel.split(os.sep))
+
+    def _update(self, path, emit=True):
+        if not self._in_project(path):
+            return
+        try:
+            stat = os.stat(path)
+        except OSError:
+            self._remove(path, emit)
+            return
+        entry = self.files.get(path)
+        if entry and entry.size == stat.st_size and entry.mtime == stat.st_mtime:
+            return
+        try:
+            content_hash = hash_file(path)
+        except OSError:
+            self._remove(path, emit)
+            return
+        if entry and entry.content_hash == content_hash:
+            entry.size, entry.mtime = stat.st_size, stat.st_mtime
+            return
+
+        self.files[path] = FileEntry(path, stat.st_size, stat.st_mtime, content_hash)
+        self.by_name.setdefault(os.path.basename(path), set()).add(path)
+        if entry is None:
+            self.watcher.addPath(path)
+        if emit:
+            (self.file_changed if entry else self.file_added).emit(path)
+
+    def _remove(self, path, emit=True):
+        if self.files.pop(path, None) is None:
+            return
+        names = self.by_name.get(os.path.basename(path))
+        if names:
+            names.discard(path)
+            if not names:
+                del self.by_name[os.path.basename(path)]
+        self.origins.pop(path, None)
+        self.watcher.removePath(path)
+        if emit:
+            self.file_removed.emit(path)
+
+    def _directory_changed(self, dirpath):
+        # Only the changed directory is re-listed; unchanged files are skipped on size and mtime.
+        dirpath = os.path.normpath(dirpath)
+        if not os.path.isdir(dirpath):
+            for path in [p for p in self.files if p.startswith(dirpath + os.sep)]:
+                self._remove(path)
+            return
+        seen = set()
+        for entry in os.scandir(dirpath):
+            path = os.path.normpath(entry.path)
+            if entry.is_dir():
+                if entry.name not in IGNORED_DIRS and path not in self.watcher.directories():
+                    self.watcher.addPath(path)
+                    self._directory_changed(path)
+            elif entry.is_file():
+                seen.add(path)
+                self._update(path)
+        for path in [p for p in self.files if os.path.dirname(p) == dirpath and p not in seen]:
+            self._remove(path)
+
+    def _file_changed(self, path):
+        path = os.path.normpath(path)
+        self._update(path)
+        # Editors that save by rename drop the watch, so re-arm it if the file is still there.
+        if path in self.files and path not in self.watcher.files():
+            self.watcher.addPath(path)
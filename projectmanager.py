@@ -3,11 +3,16 @@ import os
 import sys
 import subprocess
 from PyQt5.QtWidgets import QInputDialog, QMessageBox, QFileDialog
+from projectindex import ProjectIndex, IGNORED_DIRS
+from filewriter import WriteBehindWriter
 
 class ProjectManager:
     def __init__(self):
         self.project_dir = None
         self.current_file_path = None
+        self.index = ProjectIndex()
+        self.writer = WriteBehindWriter(on_written=self.index.refresh_requested.emit,
+                                        on_failed=lambda path, error: self.index.write_failed.emit(path, str(error)))
 
     def create_new_project(self):
         try:
@@ -26,6 +31,8 @@ class ProjectManager:
                 subprocess.run([sys.executable, '-m', 'venv', venv_dir], check=True)
                 print(f"Created virtual environment: {venv_dir}")
 
+                self.index.open(self.project_dir)
+
         except Exception as e:
             QMessageBox.critical(None, 'Error', f'An error occurred: {str(e)}')
 
@@ -33,6 +40,7 @@ class ProjectManager:
         project_dir = QFileDialog.getExistingDirectory(None, 'Open Project', os.getcwd())
         if project_dir:
             self.project_dir = project_dir
+            self.index.open(project_dir)
             project_name = os.path.basename(project_dir)
             return project_name
 
@@ -44,6 +52,7 @@ class ProjectManager:
                 with open(file_path, 'w') as file:
                     file.write('')
                 print(f"Created new file: {file_path}")
+                self.index.refresh(file_path)
                 self.current_file_path = file_path
         else:
             QMessageBox.warning(None, 'Warning', 'No project created yet. Please create a new project first.')
@@ -59,8 +68,71 @@ class ProjectManager:
         else:
             QMessageBox.warning(None, 'Warning', 'No project opened. Please open a project first.')
 
-    def write_to_file(self, content):
-        if self.current_file_path:
-            with open(self.current_file_path, 'w') as file:
-                file.write(content)
-            print(f"Updated file: {self.current_file_path}")
\ No newline at end of file
+    def venv_python(self):
+        venv_dir = os.path.join(self.project_dir, 'venv')
+        return os.path.join(venv_dir, 'Scripts', 'python') if sys.platform == 'win32' else os.path.join(venv_dir, 'bin', 'python')
+
+    def open_indexed_file(self, name):
+        entry = self.index.lookup(name)
+        if entry is None:
+            QMessageBox.warning(None, 'Warning', f'No file named {name} in the current project.')
+            return None
+        try:
+            with open(entry.path, 'r', encoding='utf-8') as file:
+                file_content = file.read()
+        except UnicodeDecodeError:
+            QMessageBox.warning(None, 'Warning', f'{os.path.basename(entry.path)} is not a text file (for example a .prof profile) and can\'t be opened here.')
+            return None
+        except OSError as e:
+            QMessageBox.warning(None, 'Warning', f'Could not open {os.path.basename(entry.path)}: {str(e)}')
+            return None
+        self.current_file_path = entry.path
+        return file_content
+
+    def write_to_file(self, content, file_path=None):
+        file_path = file_path or self.current_file_path
+        if file_path:
+            self.writer.write(file_path, content)
+
+    def project_path(self, name):
+        # Resolves a model-suggested file name inside the project, refusing anything that escapes
+        # it or lands in a directory the project doesn't own (venv, .git, ...).
+        path = os.path.normpath(os.path.join(self.project_dir, name.lstrip('/\\')))
+        rel = os.path.relpath(path, self.project_dir)
+        if rel.startswith(os.pardir) or any(part in IGNORED_DIRS for part in rel.split(os.sep)):
+            return None
+        return path
+
+    def is_claimed(self, path, origin):
+        # A file belongs to someone else if another task generated it, or if it exists (or is
+        # queued) without having been generated at all, like main.py or a hand-written module.
+        owner = self.index.origin_of(path)
+        if owner is not None:
+            return owner is not origin
+        return os.path.exists(path) or self.writer.is_queued(path)
+
+    def write_code_blocks(self, blocks, primary_path, origin=None):
+        # Model-suggested names are used only when they don't overwrite another file;
+        # otherwise the block is saved next to the primary file as <base>_<i><ext>.
+        base = os.path.splitext(primary_path)[0]
+        written = []
+        for i, block in enumerate(blocks, start=1):
+            path = self.project_path(block.filename) if block.filename else None
+            if path is None or path == primary_path or path in written or self.is_claimed(path, origin):
+                path = f"{base}_{i}{block.extension}"
+                suffix = i
+                while path in written or self.is_claimed(path, origin):
+                    suffix += len(blocks)
+                    path = f"{base}_{suffix}{block.extension}"
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            if origin is not None:
+                self.index.register_origin(path, origin)
+            self.write_to_file(block.code, path)
+            written.append(path)
+        return written
+
+    def flush(self, file_path=None):
+        self.writer.flush(file_path)
+
+    def close(self):
+        self.writer.close()
\ No newline at end of file
@@ -0,0 +1,175 @@
+# searchindex.py
+import os
+import re
+import math
+import bisect
+
+TOKEN_RE = re.compile(r'[A-Za-z_][A-Za-z0-9_]*|\d+')
+MAX_FILE_SIZE = 1024 * 1024
+MAX_RESULTS = 50
+SNIPPET_LENGTH = 120
+
+# Matches in a prompt say more about what a task is than matches in its code or output.
+FIELD_WEIGHTS = {'prompt': 3.0, 'code': 2.0, 'file': 1.5, 'output': 1.0}
+
+def tokenize(text):
+    # Yields (token, position). snake_case and camelCase identifiers are also indexed by
+    # their parts, at the identifier's own position, so "parse" finds parse_libraries.
+    position = 0
+    for match in TOKEN_RE.finditer(text):
+        word = match.group()
+        lowered = word.lower()
+        yield lowered, position
+        parts = [p.lower() for p in re.findall(r'[A-Z]?[a-z0-9]+|[A-Z]+(?![a-z])', word)]
+        if len(parts) > 1:
+            for part in set(parts):
+                if part != lowered:
+                    yield part, position
+        position += 1
+
+class Document:
+    def __init__(self, key, kind, target, field, title, text):
+        self.key = key
+        self.kind = kind        # 'task' or 'file'
+        self.target = target    # TaskNode or absolute file path
+        self.field = field
+        self.title = title
+        self.text = text
+
+class SearchResult:
+    def __init__(self, document, score, snippet):
+        self.document = document
+        self.score = score
+        self.snippet = snippet
+
+class SearchIndex:
+    # Positional inverted index over task prompts, code and outputs and over project files.
+    # Documents are replaced one at a time as they change, so a query never touches the disk.
+    def __init__(self):
+        self.documents = {}   # key -> Document
+        self.postings = {}    # token -> {key: [positions]}
+        self.doc_tokens = {}  # key -> set of tokens, for removal
+        self.vocabulary = []  # sorted tokens, for prefix lookups
+
+    def add(self, key, kind, target, field, title, text):
+        existing = self.documents.get(key)
+        if existing and existing.text == text:
+            existing.title = title
+            return
+        self.remove(key)
+        if not text.strip():
+            return
+        self.documents[key] = Document(key, kind, target, field, title, text)
+        tokens = set()
+        for token, position in tokenize(text):
+            postings = self.postings.get(token)
+            if postings is None:
+                postings = self.postings[token] = {}
+                bisect.insort(self.vocabulary, token)
+            postings.setdefault(key, []).append(position)
+            tokens.add(token)
+        self.doc_tokens[key] = tokens
+
+    def remove(self, key):
+        if self.documents.pop(key, None) is None:
+            return
+        for token in self.doc_tokens.pop(key, ()):
+            postings = self.postings[token]
+            postings.pop(key, None)
+            if not postings:
+                del self.postings[token]
+                i = bisect.bisect_left(self.vocabulary, token)
+                if i < len(self.vocabulary) and self.vocabulary[i] == token:
+                    del self.vocabulary[i]
+
+    def index_task(self, node, title):
+        # A subtask's prompt repeats the whole breakdown, so its own description is indexed
+        # instead; otherwise every sibling would match every subtask's words.
+        for field in ('prompt', 'code', 'output'):
+            text = node.task.get('subtask') if field == 'prompt' and node.task.get('subtask') else node.task.get(field)
+            self.add((node, field), 'task', node, field, title, text or '')
+
+    def remove_task(self, node):
+        for child in node.children:
+            self.remove_task(child)
+        for field in ('prompt', 'code', 'output'):
+            self.remove((node, field))
+
+    def index_file(self, path, title=None):
+        try:
+            if os.path.getsize(path) > MAX_FILE_SIZE:
+                self.remove(('file', path))
+                return
+            with open(path, 'r', encoding='utf-8') as file:
+                text = file.read()
+        except (OSError, UnicodeDecodeError):
+            # Deleted in the meantime, or binary (.prof dumps and the like).
+            self.remove(('file', path))
+            return
+        self.add(('file', path), 'file', path, 'file', title or os.path.basename(path), text)
+
+    def remove_file(self, path):
+        self.remove(('file', path))
+
+    def remove_files(self):
+        for key in [key for key, document in self.documents.items() if document.kind == 'file']:
+            self.remove(key)
+
+    def _expand(self, term, prefix):
+        if not prefix:
+            return [term] if term in self.postings else []
+        start = bisect.bisect_left(self.vocabulary, term)
+        end = bisect.bisect_left(self.vocabulary, term + '\uffff')
+        return self.vocabulary[start:end]
+
+    def search(self, query, limit=MAX_RESULTS):
+        # Every term must match. The last term is a prefix while it is still being typed,
+        # i.e. unless the query ends with whitespace. Documents containing the terms as a
+        # phrase rank above ones that only contain them somewhere.
+        terms = list(dict.fromkeys(m.group().lower() for m in TOKEN_RE.finditer(query)))
+        if not terms:
+            return []
+        typing = not query[-1:].isspace()
+        matches = []  # per term, in query order: {key: positions}
+        for i, term in enumerate(terms):
+            positions = {}
+            for token in self._expand(term, typing and i == len(terms) - 1):
+                for key, token_positions in self.postings[token].items():
+                    positions.setdefault(key, []).extend(token_positions)
+            if not positions:
+                return []
+            matches.append(positions)
+
+        smallest, *rest = sorted(matches, key=len)
+        candidates = set(smallest)
+        for positions in rest:
+            candidates &= positions.keys()
+
+        total = len(self.documents)
+        results = []
+        for key in candidates:
+            document = self.documents[key]
+            score = 0.0
+            for positions in matches:
+                idf = math.log(1 + total / len(positions))
+                score += (1 + math.log(len(positions[key]))) * idf
+            if len(matches) > 1 and self._has_phrase([set(p[key]) for p in matches]):
+                score *= 2
+            score *= FIELD_WEIGHTS.get(document.field, 1.0)
+            results.append(SearchResult(document, score, self._snippet(document.text, terms)))
+        results.sort(key=lambda r: r.score, reverse=True)
+        return results[:limit]
+
+    def _has_phrase(self, positions):
+        return any(all(start + i in p for i, p in enumerate(positions[1:], start=1)) for start in positions[0])
+
+    def _snippet(self, text, terms):
+        lowered = text.lower()
+        index = min((i for i in (lowered.find(t) for t in terms) if i >= 0), default=0)
+        start = lowered.rfind('\n', 0, index) + 1
+        end = lowered.find('\n', index)
+        line = text[start:end if end >= 0 else len(text)].strip()
+        if len(line) > SNIPPET_LENGTH:
+            offset = max(index - start - SNIPPET_LENGTH // 3, 0)
+            line = '...' + line[offset:offset + SNIPPET_LENGTH] + '...'
+        return line
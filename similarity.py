@@ -0,0 +1,112 @@
+# similarity.py
+import os
+import re
+import json
+import hashlib
+import tempfile
+
+WORD_RE = re.compile(r'[a-z0-9_$]+')
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+
+def _permutations(num_perm, seed=1):
+    # Fixed (a, b) pairs so signatures stay comparable across runs and saved indexes.
+    params = []
+    for i in range(num_perm):
+        digest = hashlib.sha1(f'{seed}:{i}'.encode()).digest()
+        a = int.from_bytes(digest[:8], 'little') % (MERSENNE_PRIME - 1) + 1
+        b = int.from_bytes(digest[8:16], 'little') % MERSENNE_PRIME
+        params.append((a, b))
+    return params
+
+PERMUTATIONS = _permutations(NUM_PERM)
+
+def shingles(text, size=5):
+    # Character shingles over the normalized words, so short subtask prompts that differ
+    # by a word or two still share most of their shingles.
+    normalized = ' '.join(WORD_RE.findall(text.lower()))
+    if len(normalized) <= size:
+        return {normalized} if normalized else set()
+    return {normalized[i:i + size] for i in range(len(normalized) - size + 1)}
+
+def minhash(text):
+    hashes = [int.from_bytes(hashlib.blake2b(s.encode(), digest_size=4).digest(), 'little')
+              for s in shingles(text)]
+    if not hashes:
+        return [MAX_HASH] * NUM_PERM
+    return [min(((a * h + b) % MERSENNE_PRIME) & MAX_HASH for h in hashes) for a, b in PERMUTATIONS]
+
+def estimate_similarity(sig_a, sig_b):
+    return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / len(sig_a)
+
+class SimilarityIndex:
+    # MinHash signatures over character 5-gram shingles, bucketed with LSH bands so a
+    # lookup only compares against prompts that share at least one band.
+    def __init__(self, path, threshold=0.6):
+        self.path = path
+        self.threshold = threshold
+        self.entries = []
+        self.buckets = {}
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as file:
+                entries = json.load(file)
+        except (OSError, ValueError) as e:
+            print(f"Could not load similarity index {self.path}: {e}")
+            return
+        for entry in entries:
+            self._insert(entry)
+
+    def save(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(prefix='.prompt_index.', suffix='.tmp', dir=directory)
+        with os.fdopen(fd, 'w', encoding='utf-8') as file:
+            json.dump(self.entries, file)
+        os.replace(tmp_path, self.path)
+
+    def add(self, prompt, code, kind='task'):
+        if not prompt.strip() or not code.strip():
+            return
+        signature = minhash(prompt)
+        for entry in self.entries:
+            if entry['signature'] == signature and entry['kind'] == kind:
+                # Re-approving the same prompt keeps only the newest code.
+                entry['code'] = code
+                self.save()
+                return
+        self._insert({'prompt': prompt, 'code': code, 'kind': kind, 'signature': signature})
+        self.save()
+
+    def find(self, prompt, kind=None):
+        signature = minhash(prompt)
+        candidates = set()
+        for band, key in self._bands(signature):
+            candidates.update(self.buckets.get((band, key), ()))
+
+        best, best_score = None, 0.0
+        for i in candidates:
+            entry = self.entries[i]
+            if kind is not None and entry['kind'] != kind:
+                continue
+            score = estimate_similarity(signature, entry['signature'])
+            if score > best_score:
+                best, best_score = entry, score
+        if best is None or best_score < self.threshold:
+            return None, 0.0
+        return best, best_score
+
+    def _insert(self, entry):
+        self.entries.append(entry)
+        for band_key in self._bands(entry['signature']):
+            self.buckets.setdefault(band_key, []).append(len(self.entries) - 1)
+
+    def _bands(self, signature):
+        for band in range(BANDS):
+            yield band, tuple(signature[band * ROWS:(band + 1) * ROWS])
@@ -0,0 +1,95 @@
+# structured.py
+import ast
+import json
+from codeblocks import extract_blocks, split_primary
+
+STRUCTURED_PROMPT = """Analyze the following prompt and complete it in a single JSON response.
+
+If it's a simple task that can be completed directly, respond with:
+{{"type": "simple", "code": "<complete python program>"}}
+
+If it's a complex task that should be broken down into subtasks, respond with:
+{{"type": "complex", "subtasks": [{{"prompt": "<subtask prompt>", "code": "<python code for this subtask>"}}, ...]}}
+
+When creating the subtasks, the following is vital:
+- Each subtask prompt should be written as an AI prompt that can be used to generate code for that specific part of the task.
+- Provide all necessary context or constraints to ensure the generated code snippets will be compatible.
+- Each subtask's code must only implement that subtask, keeping the other subtasks in mind.
+- Code values are plain python source, not markdown.
+
+Respond with JSON only.
+
+**Prompt:** {prompt}"""
+
+class StructuredResponseError(ValueError):
+    pass
+
+class StructuredSubtask:
+    def __init__(self, prompt, code=None):
+        self.prompt = prompt
+        self.code = code  # None when the model left it out or it failed validation
+
+class StructuredResult:
+    def __init__(self, kind, code=None, subtasks=None):
+        self.kind = kind
+        self.code = code
+        self.subtasks = subtasks or []
+
+def _strip_fences(code):
+    if '```' not in code:
+        return code
+    primary, _ = split_primary(extract_blocks(code))
+    return primary.code if primary else code
+
+def _valid_text(value):
+    return isinstance(value, str) and value.strip() != ''
+
+def _subtask_code(value):
+    # Code that doesn't parse is treated like missing code: a subtask then gets its own
+    # request, and a simple response is rejected so the regular request path takes over.
+    if not _valid_text(value):
+        return None
+    code = _strip_fences(value)
+    try:
+        ast.parse(code)
+    except SyntaxError:
+        return None
+    return code
+
+def parse_structured_response(text):
+    # Validates the response against the schema in STRUCTURED_PROMPT. A broken envelope
+    # raises; a broken subtask only loses its code so it can be generated on its own.
+    text = text.strip()
+    if text.startswith('```'):
+        blocks = extract_blocks(text)
+        if blocks:
+            text = blocks[0].code
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError as e:
+        raise StructuredResponseError(f'Response is not valid JSON: {e}')
+    if not isinstance(data, dict):
+        raise StructuredResponseError('Response is not a JSON object.')
+
+    kind = data.get('type')
+    if kind == 'simple':
+        code = _subtask_code(data.get('code'))
+        if code is None:
+            raise StructuredResponseError('Simple task response has no valid Python code.')
+        return StructuredResult('simple', code=code)
+
+    if kind != 'complex':
+        raise StructuredResponseError(f'Unknown response type: {kind!r}')
+    entries = data.get('subtasks')
+    if not isinstance(entries, list) or not entries:
+        raise StructuredResponseError('Complex task response has no subtasks.')
+
+    subtasks = []
+    for i, entry in enumerate(entries, start=1):
+        if isinstance(entry, str) and entry.strip():
+            entry = {'prompt': entry}
+        if not isinstance(entry, dict) or not _valid_text(entry.get('prompt')):
+            subtasks.append(StructuredSubtask(f'Complete subtask #{i} of the overall task.'))
+            continue
+        subtasks.append(StructuredSubtask(entry['prompt'].strip(), _subtask_code(entry.get('code'))))
+    return StructuredResult('complex', subtasks=subtasks)
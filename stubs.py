@@ -0,0 +1,181 @@
+# stubs.py
+import ast
+
+DEFAULT_TOKEN_BUDGET = 1500
+SHORT_VALUE_LENGTH = 80
+
+# Detail levels, tried from most to least detailed until the interfaces fit the budget.
+FULL, SUMMARY, SIGNATURES = 2, 1, 0
+
+def estimate_tokens(text):
+    # Rough count for code: about four characters per token.
+    return (len(text) + 3) // 4
+
+def _docstring(node, detail, indent):
+    doc = ast.get_docstring(node)
+    if not doc or detail == SIGNATURES:
+        return []
+    if detail == SUMMARY:
+        doc = doc.strip().splitlines()[0]
+    doc = doc.replace('"""', '\\"\\"\\"')
+    lines = doc.splitlines() or ['']
+    if len(lines) == 1:
+        return [f'{indent}"""{lines[0]}"""']
+    return [f'{indent}"""{lines[0]}'] + [f'{indent}{line}' if line else '' for line in lines[1:]] + [f'{indent}"""']
+
+def _assignment(node, indent):
+    value = getattr(node, 'value', None)
+    if isinstance(node, ast.AnnAssign):
+        target = f'{ast.unparse(node.target)}: {ast.unparse(node.annotation)}'
+    else:
+        target = ' = '.join(ast.unparse(t) for t in node.targets)
+    if value is None:
+        return f'{indent}{target}'
+    text = ast.unparse(value)
+    if len(text) > SHORT_VALUE_LENGTH:
+        text = '...'
+    return f'{indent}{target} = {text}'
+
+def _is_public(name):
+    return not name.startswith('_') or (name.startswith('__') and name.endswith('__'))
+
+def _function(node, detail, indent):
+    prefix = 'async def' if isinstance(node, ast.AsyncFunctionDef) else 'def'
+    decorators = [f'{indent}@{ast.unparse(d)}' for d in node.decorator_list] if detail != SIGNATURES else []
+    returns = f' -> {ast.unparse(node.returns)}' if node.returns else ''
+    lines = decorators + [f'{indent}{prefix} {node.name}({ast.unparse(node.args)}){returns}:']
+    body = _docstring(node, detail, indent + '    ')
+    return lines + body + [f'{indent}    ...']
+
+def _instance_attributes(init):
+    names = []
+    for node in ast.walk(init):
+        targets = node.targets if isinstance(node, ast.Assign) else [node.target] if isinstance(node, ast.AnnAssign) else []
+        for target in targets:
+            if isinstance(target, ast.Attribute) and isinstance(target.value, ast.Name) and target.value.id == 'self':
+                if target.attr not in names:
+                    names.append(target.attr)
+    return names
+
+def _class(node, detail, indent):
+    bases = [ast.unparse(b) for b in node.bases] + [ast.unparse(k) for k in node.keywords]
+    header = f'{indent}class {node.name}({", ".join(bases)}):' if bases else f'{indent}class {node.name}:'
+    lines = [header] + _docstring(node, detail, indent + '    ')
+    body = []
+    for child in node.body:
+        if isinstance(child, (ast.Assign, ast.AnnAssign)):
+            body.append(_assignment(child, indent + '    '))
+        elif isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            if detail != FULL and not _is_public(child.name):
+                continue
+            if child.name == '__init__':
+                attributes = [a for a in _instance_attributes(child) if detail == FULL or _is_public(a)]
+                if attributes:
+                    body.append(f'{indent}    # instance attributes: {", ".join(attributes)}')
+            body.extend(_function(child, detail, indent + '    '))
+        elif isinstance(child, ast.ClassDef) and (detail == FULL or _is_public(child.name)):
+            body.extend(_class(child, detail, indent + '    '))
+    return lines + (body or [f'{indent}    ...'])
+
+def extract_interface(source, detail=FULL):
+    # Reduces a module to what other code needs in order to use it: imports, constants,
+    # signatures, docstrings and class layouts. Function bodies are dropped.
+    tree = ast.parse(source)
+    lines = _docstring(tree, detail, '')
+    for node in tree.body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            if detail != SIGNATURES:
+                lines.append(ast.unparse(node))
+        elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+            names = [t.id for t in (node.targets if isinstance(node, ast.Assign) else [node.target]) if isinstance(t, ast.Name)]
+            if names and (detail == FULL or any(_is_public(n) for n in names)):
+                lines.append(_assignment(node, ''))
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            if detail == FULL or _is_public(node.name):
+                lines.extend(_function(node, detail, ''))
+        elif isinstance(node, ast.ClassDef):
+            if detail == FULL or _is_public(node.name):
+                lines.extend(_class(node, detail, ''))
+    return '\n'.join(lines)
+
+def _truncate(text, tokens):
+    limit = tokens * 4
+    if len(text) <= limit:
+        return text
+    cut = text.rfind('\n', 0, limit)
+    return text[:cut if cut > 0 else limit] + '\n# ... (truncated to fit the prompt budget)'
+
+def pack_interfaces(modules, budget=DEFAULT_TOKEN_BUDGET):
+    # modules is a list of (title, source). Every module keeps the same detail level;
+    # if even bare signatures don't fit, each module gets an equal share of the budget.
+    if not modules:
+        return ''
+    for detail in (FULL, SUMMARY, SIGNATURES):
+        sections = []
+        for title, source in modules:
+            try:
+                interface = extract_interface(source, detail)
+            except SyntaxError:
+                interface = '# (could not be parsed)'
+            sections.append(f'# {title}\n{interface}')
+        packed = '\n\n'.join(sections)
+        if estimate_tokens(packed) <= budget:
+            return packed
+    share = max(budget // len(modules) - 12, 1)
+    return '\n\n'.join(_truncate(section, share) for section in sections)
+
+def _is_main_guard(node):
+    # if __name__ == '__main__': (either way round)
+    if not isinstance(node, ast.If) or not isinstance(node.test, ast.Compare):
+        return False
+    test = node.test
+    if len(test.ops) != 1 or not isinstance(test.ops[0], ast.Eq):
+        return False
+    sides = [test.left, test.comparators[0]]
+    return (any(isinstance(s, ast.Name) and s.id == '__name__' for s in sides)
+            and any(isinstance(s, ast.Constant) and s.value == '__main__' for s in sides))
+
+def assemble_modules(modules, main_module=-1):
+    # Inlines full module sources into one program. Top-level imports are hoisted and
+    # de-duplicated; everything else keeps its original order under a header per module.
+    # Only modules[main_module] keeps its `if __name__ == '__main__':` block, so the other
+    # subtasks' demos and input() drivers don't all run one after another.
+    imports = []
+    bodies = []
+    futures = []  # per parsed module, the __future__ features it enables
+    main_index = main_module % len(modules) if modules else None
+    for index, (title, source) in enumerate(modules):
+        try:
+            tree = ast.parse(source)
+        except SyntaxError:
+            bodies.append(f'# {title}\n{source.strip()}')
+            continue
+        lines = source.splitlines()
+        dropped_lines = set()
+        features = set()
+        for node in tree.body:
+            if isinstance(node, ast.ImportFrom) and node.module == '__future__':
+                features.update(alias.name for alias in node.names)
+                dropped_lines.update(range(node.lineno - 1, node.end_lineno))
+            elif isinstance(node, (ast.Import, ast.ImportFrom)):
+                statement = ast.unparse(node)
+                if statement not in imports:
+                    imports.append(statement)
+                dropped_lines.update(range(node.lineno - 1, node.end_lineno))
+            elif index != main_index and _is_main_guard(node):
+                dropped_lines.update(range(node.lineno - 1, node.end_lineno))
+        futures.append(features)
+        body = '\n'.join(line for i, line in enumerate(lines) if i not in dropped_lines).strip()
+        bodies.append(f'# {title}\n{body}')
+    # A __future__ import changes the semantics of the whole file, so a feature is only
+    # kept when every module asked for it; e.g. `annotations` from one subtask would
+    # otherwise turn the others' annotations into strings.
+    header = []
+    if futures:
+        kept = sorted(set.intersection(*futures))
+        dropped = sorted(set.union(*futures) - set(kept))
+        if kept:
+            header.append(f"from __future__ import {', '.join(kept)}")
+        if dropped:
+            header.append(f"# Not every module uses `from __future__ import {', '.join(dropped)}`, so it was left out.")
+    return '\n'.join(header + imports) + '\n\n\n' + '\n\n\n'.join(bodies) + '\n'